@@ -0,0 +1,24 @@
+#!/bin/bash
+set -euo pipefail
+
+# Build the sandbox image used by the container executor.
+#
+# Usage: docker/build-image.sh [--push]
+#
+# Set CACHE_REF to a registry reference (e.g. ghcr.io/org/pixell-python-agent:cache)
+# to reuse and publish layer cache across machines.
+
+IMAGE="${IMAGE:-pixell-python-agent:latest}"
+CONTEXT_DIR="$(cd "$(dirname "$0")" && pwd)"
+
+ARGS=(--tag "$IMAGE" --cache-to type=inline)
+if [ -n "${CACHE_REF:-}" ]; then
+    ARGS+=(--cache-from "type=registry,ref=$CACHE_REF")
+fi
+if [ "${1:-}" = "--push" ]; then
+    ARGS+=(--push)
+else
+    ARGS+=(--load)
+fi
+
+docker buildx build "${ARGS[@]}" "$CONTEXT_DIR"
@@ -1,25 +1,181 @@
 import asyncio
+import collections
+import os
 import grpc
 from concurrent import futures
-from typing import AsyncIterator
+from typing import Any, AsyncIterator, Dict, Mapping, Optional
 import structlog
-import msgpack
+import msgspec
 import time
 
 from . import python_agent_pb2
 from . import python_agent_pb2_grpc
-from ..engine.execution_engine import ExecutionEngine
+from ..engine.execution_engine import ExecutionEngine, ExecutionResult
 from ..sessions.manager import SessionManager
 
 logger = structlog.get_logger()
 
+# Encode buffer pool sizing: buffers start at 64KB and anything that grew past
+# 4MB while encoding a large result is dropped instead of being pooled.
+_BUFFER_SIZE = 64 * 1024
+_MAX_POOLED_BUFFER_SIZE = 4 * 1024 * 1024
+_BUFFER_POOL_SIZE = 64
+
+# Payloads above this size are (de)serialized in the default executor so that a
+# large context does not stall the event loop for every other RPC
+_OFFLOAD_THRESHOLD = 64 * 1024
+
+# StreamExecute coalescing: consecutive chunks of the same type produced within
+# this window are merged into one message, up to the byte limit.
+_STREAM_COALESCE_WINDOW = 0.001
+_STREAM_COALESCE_MAX_BYTES = 32 * 1024
+
+
+async def _coalesce_chunks(
+    chunks: AsyncIterator[python_agent_pb2.StreamChunk],
+    window: float = _STREAM_COALESCE_WINDOW,
+    max_bytes: int = _STREAM_COALESCE_MAX_BYTES,
+) -> AsyncIterator[python_agent_pb2.StreamChunk]:
+    """Merge bursts of same-type stream chunks to amortize per-message framing.
+
+    The pending read is kept as a task and awaited with ``asyncio.wait`` so that a
+    window expiring never cancels (and thereby closes) the underlying generator.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = aiter(chunks)
+    next_chunk = None
+
+    try:
+        while True:
+            if next_chunk is None:
+                next_chunk = asyncio.ensure_future(anext(iterator))
+            try:
+                first = await next_chunk
+            except StopAsyncIteration:
+                return
+            next_chunk = None
+
+            parts = [first.data]
+            size = len(first.data)
+            deadline = loop.time() + window
+
+            while size < max_bytes:
+                next_chunk = asyncio.ensure_future(anext(iterator))
+                done, _ = await asyncio.wait((next_chunk,), timeout=max(deadline - loop.time(), 0))
+                # Leave pending reads, errors and type changes for the outer loop
+                if not done or next_chunk.exception() is not None:
+                    break
+                chunk = next_chunk.result()
+                if chunk.type != first.type:
+                    break
+                next_chunk = None
+                parts.append(chunk.data)
+                size += len(chunk.data)
+
+            if len(parts) == 1:
+                # Nothing was merged, forward the message untouched
+                yield first
+            else:
+                yield python_agent_pb2.StreamChunk(
+                    type=first.type, data=b"".join(parts), timestamp=first.timestamp
+                )
+    finally:
+        if next_chunk is not None and not next_chunk.done():
+            next_chunk.cancel()
+
 
 class PythonAgentServicer(python_agent_pb2_grpc.PythonAgentServicer):
     """gRPC service implementation for Python Agent A2A protocol."""
 
-    def __init__(self):
-        self.engine = ExecutionEngine()
-        self.session_manager = SessionManager()
+    def __init__(
+        self,
+        engine: Optional[ExecutionEngine] = None,
+        session_manager: Optional[SessionManager] = None,
+    ):
+        self.engine = engine or ExecutionEngine()
+        self.session_manager = session_manager or SessionManager()
+        # Reusable msgpack codecs, wire-compatible with msgpack(use_bin_type=True)
+        self._encoder = msgspec.msgpack.Encoder()
+        self._decoder = msgspec.msgpack.Decoder()
+        self._buffer_pool: collections.deque = collections.deque(maxlen=_BUFFER_POOL_SIZE)
+
+    def _acquire_buffer(self) -> bytearray:
+        """Take an encode buffer from the pool, allocating one if it is empty."""
+        try:
+            return self._buffer_pool.pop()
+        except IndexError:
+            return bytearray(_BUFFER_SIZE)
+
+    def _release_buffer(self, buffer: bytearray):
+        """Return an encode buffer to the pool unless it grew oversized."""
+        if len(buffer) <= _MAX_POOLED_BUFFER_SIZE:
+            self._buffer_pool.append(buffer)
+
+    def _unpack_map(self, mapping: Mapping[str, bytes]) -> Dict[str, Any]:
+        """Decode a protobuf ``map<string, bytes>`` of msgpack values in a single pass."""
+        decode = self._decoder.decode
+        return {key: decode(value) for key, value in mapping.items()}
+
+    def _pack_map(self, values: Mapping[str, Any]) -> Dict[str, bytes]:
+        """Encode a mapping into msgpack values using a pooled buffer.
+
+        All values are encoded back to back into one contiguous buffer and each
+        entry is then copied out exactly once through a memoryview slice.
+        """
+        encode_into = self._encoder.encode_into
+        buffer = self._acquire_buffer()
+        try:
+            spans = []
+            offset = 0
+            for key, value in values.items():
+                encode_into(value, buffer, offset)
+                end = len(buffer)
+                spans.append((key, offset, end))
+                offset = end
+
+            # The view must be released before the buffer can be resized again
+            with memoryview(buffer) as view:
+                return {key: bytes(view[start:end]) for key, start, end in spans}
+        finally:
+            self._release_buffer(buffer)
+
+    async def _unpack_context(self, mapping: Mapping[str, bytes]) -> Dict[str, Any]:
+        """Decode request context, in a worker thread when it is large.
+
+        Decoding runs per key, so the event loop gets a chance to run between
+        values even though each individual decode holds the GIL.
+        """
+        if sum(len(value) for value in mapping.values()) < _OFFLOAD_THRESHOLD:
+            return self._unpack_map(mapping)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._unpack_map, mapping)
+
+    async def _pack_values(self, values: Mapping[str, Any]) -> Dict[str, bytes]:
+        """Encode values, in a worker thread when they look large.
+
+        The size is a rough estimate: str/bytes count their length and
+        containers their element count, which errs towards encoding inline.
+        """
+        size = sum(len(value) if hasattr(value, "__len__") else 8 for value in values.values())
+        if size < _OFFLOAD_THRESHOLD:
+            return self._pack_map(values)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._pack_map, values)
+
+    async def _build_response(self, result: ExecutionResult) -> python_agent_pb2.ExecuteResponse:
+        """Build an ExecuteResponse by direct field assignment.
+
+        Setting fields one by one on an empty message avoids the keyword
+        constructor's per-field reflection and the intermediate results map copy.
+        """
+        response = python_agent_pb2.ExecuteResponse()
+        response.success = result.success
+        response.stdout = result.stdout
+        response.stderr = result.stderr
+        response.error = result.error or ""
+        if result.results:
+            response.results.update(await self._pack_values(result.results))
+        return response
 
     async def Execute(
         self, request: python_agent_pb2.ExecuteRequest, context: grpc.aio.ServicerContext
@@ -29,9 +185,7 @@ class PythonAgentServicer(python_agent_pb2_grpc.PythonAgentServicer):
 
         try:
             # Deserialize context
-            exec_context = {}
-            for key, value in request.context.items():
-                exec_context[key] = msgpack.unpackb(value, raw=False)
+            exec_context = await self._unpack_context(request.context)
 
             # Get or create session
             session = await self.session_manager.get_or_create(request.session_id)
@@ -46,35 +200,21 @@ class PythonAgentServicer(python_agent_pb2_grpc.PythonAgentServicer):
                 timeout=request.timeout_seconds,
             )
 
-            # Serialize results
-            serialized_results = {}
-            for key, value in result.results.items():
-                serialized_results[key] = msgpack.packb(value, use_bin_type=True)
-
-            execution_time_ms = int((time.monotonic() - start_time) * 1000)
-
-            return python_agent_pb2.ExecuteResponse(
-                success=result.success,
-                stdout=result.stdout,
-                stderr=result.stderr,
-                results=serialized_results,
-                error=result.error or "",
-                metrics=python_agent_pb2.ExecutionMetrics(
-                    execution_time_ms=execution_time_ms,
-                    memory_used_bytes=result.memory_used,
-                    cpu_percent=result.cpu_percent,
-                ),
-            )
+            response = await self._build_response(result)
+
+            metrics = response.metrics
+            metrics.execution_time_ms = int((time.monotonic() - start_time) * 1000)
+            metrics.memory_used_bytes = result.memory_used
+            metrics.cpu_percent = result.cpu_percent
+            return response
 
         except Exception as e:
             logger.exception("Error executing code", session_id=request.session_id)
-            return python_agent_pb2.ExecuteResponse(
-                success=False,
-                error=str(e),
-                metrics=python_agent_pb2.ExecutionMetrics(
-                    execution_time_ms=int((time.monotonic() - start_time) * 1000)
-                ),
-            )
+            response = python_agent_pb2.ExecuteResponse()
+            response.success = False
+            response.error = str(e)
+            response.metrics.execution_time_ms = int((time.monotonic() - start_time) * 1000)
+            return response
 
     async def StreamExecute(
         self, request: python_agent_pb2.ExecuteRequest, context: grpc.aio.ServicerContext
@@ -82,30 +222,27 @@ class PythonAgentServicer(python_agent_pb2_grpc.PythonAgentServicer):
         """Execute code with streaming output."""
         try:
             # Deserialize context
-            exec_context = {}
-            for key, value in request.context.items():
-                exec_context[key] = msgpack.unpackb(value, raw=False)
+            exec_context = await self._unpack_context(request.context)
 
             # Get or create session
             session = await self.session_manager.get_or_create(request.session_id)
 
-            # Stream execution through engine
-            async for chunk in self.engine.execute_stream(
+            # Stream execution through engine, coalescing bursts of small chunks
+            chunks = self.engine.execute_stream(
                 code=request.code,
                 context=exec_context,
                 files=request.files,
                 session=session,
                 resource_tier=request.resource_tier,
                 timeout=request.timeout_seconds,
-            ):
-                yield python_agent_pb2.StreamChunk(
-                    type=chunk.type, data=chunk.data, timestamp=chunk.timestamp
-                )
+            )
+            async for chunk in _coalesce_chunks(chunks):
+                yield chunk
 
         except Exception as e:
             logger.exception("Error in streaming execution", session_id=request.session_id)
             yield python_agent_pb2.StreamChunk(
-                type=python_agent_pb2.StreamChunk.ChunkType.ERROR,
+                type=python_agent_pb2.StreamChunk.ERROR,
                 data=str(e).encode(),
                 timestamp=int(time.time() * 1000),
             )
@@ -120,9 +257,7 @@ class PythonAgentServicer(python_agent_pb2_grpc.PythonAgentServicer):
                 context.abort(grpc.StatusCode.NOT_FOUND, f"Session {request.session_id} not found")
 
             # Serialize session variables
-            serialized_vars = {}
-            for key, value in session.variables.items():
-                serialized_vars[key] = msgpack.packb(value, use_bin_type=True)
+            serialized_vars = await self._pack_values(session.variables)
 
             return python_agent_pb2.SessionStateResponse(
                 variables=serialized_vars,
@@ -146,35 +281,58 @@ class PythonAgentServicer(python_agent_pb2_grpc.PythonAgentServicer):
             # Apply patches and re-execute
             result = await self.engine.retry_with_patch(session=session, patch=request.patch)
 
-            # Serialize results
-            serialized_results = {}
-            for key, value in result.results.items():
-                serialized_results[key] = msgpack.packb(value, use_bin_type=True)
-
-            return python_agent_pb2.ExecuteResponse(
-                success=result.success,
-                stdout=result.stdout,
-                stderr=result.stderr,
-                results=serialized_results,
-                error=result.error or "",
-            )
+            return await self._build_response(result)
 
         except Exception as e:
             logger.exception("Error retrying with patch", session_id=request.session_id)
             return python_agent_pb2.ExecuteResponse(success=False, error=str(e))
 
 
-async def serve(port: int = 50051, use_unix_socket: bool = True):
-    """Start the gRPC server."""
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create the server event loop, preferring uvloop when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
+
+
+async def serve(
+    port: int = 50051,
+    use_unix_socket: bool = True,
+    session_manager: Optional[SessionManager] = None,
+    lookahead_bytes: int = 8 * 1024 * 1024,
+    write_buffer_bytes: int = 1024 * 1024,
+):
+    """Start the gRPC server.
+
+    ``lookahead_bytes`` sets the HTTP/2 receive window and ``write_buffer_bytes``
+    the transport write buffer; raising both keeps large payloads flowing on
+    Unix sockets, whose small default kernel buffers otherwise stall transfers.
+    """
+    # Build and warm the engine before accepting traffic so the first request
+    # does not pay for image checks, container pool warmup or regex setup
+    engine = ExecutionEngine()
+    try:
+        await engine.warmup()
+    except Exception:
+        logger.exception("Engine warmup failed, deferring initialization to first request")
+
     server = grpc.aio.server(
-        futures.ThreadPoolExecutor(max_workers=10),
+        futures.ThreadPoolExecutor(max_workers=max(32, (os.cpu_count() or 1) * 4)),
         options=[
             ("grpc.max_send_message_length", 1024 * 1024 * 100),  # 100MB
             ("grpc.max_receive_message_length", 1024 * 1024 * 100),
+            ("grpc.so_reuseport", 1),
+            ("grpc.http2.max_frame_size", 16 * 1024 * 1024 - 1),  # HTTP/2 maximum
+            ("grpc.http2.lookahead_bytes", lookahead_bytes),
+            ("grpc.http2.write_buffer_size", write_buffer_bytes),
+            ("grpc.http2.bdp_probe", 1),
         ],
     )
 
-    python_agent_pb2_grpc.add_PythonAgentServicer_to_server(PythonAgentServicer(), server)
+    servicer = PythonAgentServicer(engine=engine, session_manager=session_manager)
+    python_agent_pb2_grpc.add_PythonAgentServicer_to_server(servicer, server)
 
     if use_unix_socket:
         # Unix domain socket for local communication
@@ -187,8 +345,13 @@ async def serve(port: int = 50051, use_unix_socket: bool = True):
 
     logger.info("Starting Python Agent gRPC server", address=address)
     await server.start()
-    await server.wait_for_termination()
+    try:
+        await server.wait_for_termination()
+    finally:
+        # Let in-flight calls finish briefly when serving is cancelled
+        await server.stop(grace=5)
 
 
 if __name__ == "__main__":
-    asyncio.run(serve())
+    with asyncio.Runner(loop_factory=new_event_loop) as runner:
+        runner.run(serve())
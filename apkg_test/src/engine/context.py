@@ -1,5 +1,6 @@
+import ast
 from dataclasses import dataclass
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Mapping, Optional
 
 
 @dataclass
@@ -8,7 +9,8 @@ class ExecutionContext:
 
     code: str
     patterns: List[str]
-    full_context: Dict[str, Any]
+    full_context: Mapping[str, Any]  # Request context layered over session variables
     files: List[bytes]
     data_info: Dict[str, Any]
     session_id: str
+    tree: Optional[ast.AST] = None  # Parsed code, shared between understand and plan
@@ -1,16 +1,29 @@
+import ast
 import time
 import re
-from typing import Dict, Any, List, AsyncIterator, Optional
+import hashlib
+from collections import ChainMap, OrderedDict
+from typing import Dict, Any, List, AsyncIterator, Mapping, Optional, Set, Tuple
 from dataclasses import dataclass
 import structlog
 
+from ..a2a.python_agent_pb2 import StreamChunk
 from ..sessions.manager import Session
-from ..executor.container import ContainerExecutor
-from .patterns import CodePatternDetector
+from .patterns import CodePatternDetector, parse_code
 from .context import ExecutionContext
 
 logger = structlog.get_logger()
 
+# Error keywords mapped to error types, in classification priority order
+_ERROR_TYPES = {
+    "memoryerror": "memory_error",
+    "keyerror": "key_error",
+    "typeerror": "type_error",
+    "valueerror": "value_error",
+    "filenotfounderror": "file_not_found",
+}
+_ERROR_KEYWORDS_RE = re.compile("|".join(_ERROR_TYPES))
+
 
 @dataclass
 class ExecutionResult:
@@ -29,13 +42,62 @@ class ExecutionResult:
             self.results = {}
 
 
-@dataclass
-class StreamChunk:
-    """Chunk of streaming output."""
-
-    type: int  # Maps to protobuf ChunkType
-    data: bytes
-    timestamp: int
+def _dataframe_names(tree: ast.AST) -> Set[str]:
+    """Find names assigned from pandas calls such as ``pd.read_csv(...)``."""
+    pandas_aliases = set()
+    pandas_callables = set()
+    assignments = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.name == "pandas":
+                    pandas_aliases.add(alias.asname or alias.name)
+        elif isinstance(node, ast.ImportFrom) and node.module == "pandas":
+            pandas_callables.update(alias.asname or alias.name for alias in node.names)
+        elif isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+            assignments.append(node)
+
+    frames = set()
+    for node in assignments:
+        func = node.value.func
+        if (
+            isinstance(func, ast.Attribute)
+            and isinstance(func.value, ast.Name)
+            and func.value.id in pandas_aliases
+        ) or (isinstance(func, ast.Name) and func.id in pandas_callables):
+            frames.update(target.id for target in node.targets if isinstance(target, ast.Name))
+
+    return frames
+
+
+class _ChainedIndexRewriter(ast.NodeTransformer):
+    """Rewrite ``df["col"][row]`` chained indexing into ``df.loc[row, "col"]``.
+
+    Only names assigned from a pandas call count as DataFrames, so plain list
+    and dict double subscripts are left untouched.
+    """
+
+    def __init__(self, frames: Set[str]):
+        self.frames = frames
+        self.changed = False
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.AST:
+        self.generic_visit(node)
+        inner = node.value
+        if (
+            isinstance(inner, ast.Subscript)
+            and isinstance(inner.value, ast.Name)
+            and inner.value.id in self.frames
+            and isinstance(inner.slice, ast.Constant)
+            and isinstance(inner.slice.value, str)
+            and not isinstance(node.slice, (ast.Slice, ast.Tuple))
+        ):
+            self.changed = True
+            loc = ast.Attribute(value=inner.value, attr="loc", ctx=ast.Load())
+            key = ast.Tuple(elts=[node.slice, inner.slice], ctx=ast.Load())
+            return ast.copy_location(ast.Subscript(value=loc, slice=key, ctx=node.ctx), node)
+        return node
 
 
 @dataclass
@@ -53,9 +115,20 @@ class ExecutionEngine:
     """U-P-E-E (Understand, Plan, Execute, Evaluate) engine."""
 
     def __init__(self):
+        # Imported here because the executor module imports ExecutionResult from this one
+        from ..executor.container import ContainerExecutor
+
         self.pattern_detector = CodePatternDetector()
         self.container_executor = ContainerExecutor()
         self.retry_count = 2
+        # LRU cache of detected patterns keyed by a digest of the code
+        self._pattern_cache: OrderedDict[bytes, List[str]] = OrderedDict()
+        self._pattern_cache_size = 1024
+
+    async def warmup(self):
+        """Prepare detectors and the container pool ahead of the first request."""
+        self.pattern_detector.detect("import pandas as pd\n")
+        await self.container_executor.initialize()
 
     async def execute_full(
         self,
@@ -69,10 +142,10 @@ class ExecutionEngine:
         """Execute code through full U-P-E-E pipeline."""
         try:
             # Understand phase
-            exec_context = await self.understand(code, context, files, session)
+            exec_context = self.understand(code, context, files, session)
 
             # Plan phase
-            plan = await self.plan(exec_context)
+            plan = self.plan(exec_context)
 
             # Execute phase with retries
             result = None
@@ -83,12 +156,12 @@ class ExecutionEngine:
                 if result.success:
                     break
 
-                retry_plan = await self.evaluate(result, plan, attempt)
+                retry_plan = self.evaluate(result, plan, attempt)
                 if not retry_plan:
                     break
 
                 plan = retry_plan
-                logger.info("Retrying execution", attempt=attempt + 1)
+                logger.debug("Retrying execution", attempt=attempt + 1)
 
             # Update session state
             if result and result.success:
@@ -117,8 +190,8 @@ class ExecutionEngine:
         """Execute code with streaming output."""
         try:
             # Understand and plan
-            exec_context = await self.understand(code, context, files, session)
-            plan = await self.plan(exec_context)
+            exec_context = self.understand(code, context, files, session)
+            plan = self.plan(exec_context)
 
             # Stream execution
             async for chunk in self.container_executor.execute_stream(
@@ -133,23 +206,23 @@ class ExecutionEngine:
         except Exception as e:
             logger.exception("Error in streaming execution")
             yield StreamChunk(
-                type=4,  # ERROR
+                type=StreamChunk.ERROR,
                 data=str(e).encode(),
                 timestamp=int(time.time() * 1000),
             )
 
-    async def understand(
+    def understand(
         self, code: str, context: Dict[str, Any], files: List[bytes], session: Session
     ) -> ExecutionContext:
         """Understand phase: analyze code and context."""
-        # Detect patterns in code
-        patterns = self.pattern_detector.detect(code)
+        # Detect patterns in code, parsing it at most once
+        patterns, tree = self._detect_patterns(code)
 
-        # Merge contexts
-        full_context = {**session.variables, **context}
+        # Layer request context over session variables without copying either
+        full_context = ChainMap(context, session.variables)
 
         # Analyze data shapes if present
-        data_info = await self._analyze_data(full_context)
+        data_info = self._analyze_data(full_context)
 
         return ExecutionContext(
             code=code,
@@ -158,15 +231,16 @@ class ExecutionEngine:
             files=files,
             data_info=data_info,
             session_id=session.session_id,
+            tree=tree,
         )
 
-    async def plan(self, context: ExecutionContext) -> ExecutionPlan:
+    def plan(self, context: ExecutionContext) -> ExecutionPlan:
         """Plan phase: create optimized execution plan."""
         # Determine resource needs
         resource_tier = self._estimate_resource_tier(context)
 
         # Apply optimizations
-        optimized_code = self._optimize_code(context.code, context.patterns)
+        optimized_code = self._optimize_code(context.code, context.patterns, context.tree)
 
         # Set timeout based on complexity
         timeout = self._estimate_timeout(context)
@@ -184,10 +258,14 @@ class ExecutionEngine:
     ) -> ExecutionResult:
         """Execute phase: run code in container."""
         return await self.container_executor.execute(
-            plan.code, context.full_context, plan.resource_tier, plan.timeout
+            plan.code,
+            context.full_context,
+            plan.resource_tier,
+            plan.timeout,
+            session_id=context.session_id,
         )
 
-    async def evaluate(
+    def evaluate(
         self, result: ExecutionResult, plan: ExecutionPlan, attempt: int
     ) -> Optional[ExecutionPlan]:
         """Evaluate phase: analyze errors and create retry plan."""
@@ -229,7 +307,27 @@ class ExecutionEngine:
             timeout=60,
         )
 
-    async def _analyze_data(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    def _detect_patterns(self, code: str) -> Tuple[List[str], Optional[ast.AST]]:
+        """Detect code patterns, reusing results for previously seen code.
+
+        Returns the patterns together with the parsed tree, which is only
+        available when the code had to be parsed (i.e. on a cache miss).
+        """
+        key = hashlib.blake2b(code.encode(), digest_size=16).digest()
+
+        patterns = self._pattern_cache.get(key)
+        if patterns is not None:
+            self._pattern_cache.move_to_end(key)
+            return list(patterns), None
+
+        tree = parse_code(code)
+        patterns = self.pattern_detector.detect(code, tree)
+        self._pattern_cache[key] = patterns
+        if len(self._pattern_cache) > self._pattern_cache_size:
+            self._pattern_cache.popitem(last=False)
+        return list(patterns), tree
+
+    def _analyze_data(self, context: Mapping[str, Any]) -> Dict[str, Any]:
         """Analyze data shapes in context."""
         data_info = {}
 
@@ -278,34 +376,33 @@ class ExecutionEngine:
 
         return base_memory
 
-    def _optimize_code(self, code: str, patterns: List[str]) -> str:
+    def _optimize_code(self, code: str, patterns: List[str], tree: Optional[ast.AST] = None) -> str:
         """Apply code optimizations based on patterns."""
         optimized = code
 
         # Pandas optimizations
         if "pandas" in patterns:
-            # Use .loc instead of chained indexing
-            optimized = re.sub(r"(\w+)\[([^\]]+)\]\[([^\]]+)\]", r"\1.loc[\2, \3]", optimized)
+            if tree is None:
+                tree = parse_code(code)
+            if tree is not None:
+                # Use .loc instead of chained indexing
+                rewriter = _ChainedIndexRewriter(_dataframe_names(tree))
+                tree = rewriter.visit(tree)
+                # Unparsing drops comments and formatting, so only do it on a rewrite
+                if rewriter.changed:
+                    optimized = ast.unparse(ast.fix_missing_locations(tree))
 
         # Add more optimizations as needed
         return optimized
 
     def _classify_error(self, error: str) -> str:
         """Classify error type for targeted fixes."""
-        error_lower = error.lower()
-
-        if "memoryerror" in error_lower:
-            return "memory_error"
-        elif "keyerror" in error_lower:
-            return "key_error"
-        elif "typeerror" in error_lower:
-            return "type_error"
-        elif "valueerror" in error_lower:
-            return "value_error"
-        elif "filenotfounderror" in error_lower:
-            return "file_not_found"
-        else:
-            return "unknown"
+        # One scan for every keyword, then resolve by priority order
+        found = set(_ERROR_KEYWORDS_RE.findall(error.lower()))
+        for keyword, error_type in _ERROR_TYPES.items():
+            if keyword in found:
+                return error_type
+        return "unknown"
 
     def _generate_patch(self, code: str, error_type: str, error_msg: str) -> str:
         """Generate code patch based on error type."""
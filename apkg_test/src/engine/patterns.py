@@ -1,11 +1,58 @@
 import re
 import ast
-from typing import List
+from typing import Dict, List, Optional, Set
 import structlog
 
 logger = structlog.get_logger()
 
 
+def parse_code(code: str) -> Optional[ast.AST]:
+    """Parse code into an AST, returning None if it cannot be parsed."""
+    try:
+        return ast.parse(code)
+    except Exception:
+        return None
+
+
+class _DetectVisitor(ast.NodeVisitor):
+    """Collect imports, loop nesting depth and function count in one AST walk."""
+
+    def __init__(self, import_patterns: Dict[str, List[str]]):
+        self.import_patterns = import_patterns
+        self.imports: Set[str] = set()
+        self.function_count = 0
+        self.max_loop_depth = 0
+        self._loop_depth = 0
+
+    def _match_import(self, name: str):
+        for pattern_name, keywords in self.import_patterns.items():
+            if any(kw in name for kw in keywords):
+                self.imports.add(pattern_name)
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self._match_import(alias.name)
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module:
+            self._match_import(node.module)
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.function_count += 1
+        self.generic_visit(node)
+
+    def _visit_loop(self, node: ast.AST):
+        self._loop_depth += 1
+        self.max_loop_depth = max(self.max_loop_depth, self._loop_depth)
+        self.generic_visit(node)
+        self._loop_depth -= 1
+
+    visit_For = _visit_loop
+    visit_While = _visit_loop
+
+
 class CodePatternDetector:
     """Detect patterns in Python code for optimization."""
 
@@ -78,108 +125,62 @@ class CodePatternDetector:
             ],
         }
 
-    def detect(self, code: str) -> List[str]:
-        """Detect patterns in code."""
-        patterns = []
+        # All operation categories fused into one case-insensitive regex, one named
+        # group per category. The lookahead keeps matches zero-width so a match in
+        # one category never consumes text another category would have matched.
+        alternatives = "|".join(
+            f"(?P<{name}>{'|'.join(regexes)})" for name, regexes in self.operation_patterns.items()
+        )
+        self._operations_regex = re.compile(f"(?=(?:{alternatives}))", re.IGNORECASE)
+
+    def detect(self, code: str, tree: Optional[ast.AST] = None) -> List[str]:
+        """Detect patterns in code, reusing ``tree`` when the caller already parsed it."""
+        patterns = set(self._detect_operations(code))
+
+        if tree is None:
+            tree = parse_code(code)
+
+        if tree is not None:
+            # Imports, loop depth and function count in a single traversal
+            visitor = _DetectVisitor(self.import_patterns)
+            visitor.visit(tree)
+            patterns.update(visitor.imports)
+            if visitor.max_loop_depth > 2:
+                patterns.add("nested_loops")
+            if visitor.function_count > 5:
+                patterns.add("many_functions")
+        else:
+            patterns.update(self._detect_imports_fallback(code))
 
-        # Detect imports
-        imports = self._detect_imports(code)
-        patterns.extend(imports)
-
-        # Detect operations
-        operations = self._detect_operations(code)
-        patterns.extend(operations)
-
-        # Detect complexity indicators
-        complexity = self._detect_complexity(code)
-        patterns.extend(complexity)
+        # Line count
+        line_count = len(code.splitlines())
+        if line_count > 100:
+            patterns.add("complex_code")
+        elif line_count > 50:
+            patterns.add("medium_complexity")
 
-        return list(set(patterns))
+        return list(patterns)
 
-    def _detect_imports(self, code: str) -> List[str]:
-        """Detect imported libraries."""
+    def _detect_imports_fallback(self, code: str) -> List[str]:
+        """Detect imported libraries with regexes when the code does not parse."""
         detected = []
 
-        try:
-            tree = ast.parse(code)
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        for pattern_name, keywords in self.import_patterns.items():
-                            if any(kw in alias.name for kw in keywords):
-                                detected.append(pattern_name)
-
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        for pattern_name, keywords in self.import_patterns.items():
-                            if any(kw in node.module for kw in keywords):
-                                detected.append(pattern_name)
-        except Exception:
-            # Fallback to regex if AST parsing fails
-            for pattern_name, keywords in self.import_patterns.items():
-                for kw in keywords:
-                    if re.search(rf"import\s+{kw}|from\s+{kw}", code):
-                        detected.append(pattern_name)
+        for pattern_name, keywords in self.import_patterns.items():
+            for kw in keywords:
+                if re.search(rf"import\s+{kw}|from\s+{kw}", code):
+                    detected.append(pattern_name)
 
         return detected
 
     def _detect_operations(self, code: str) -> List[str]:
         """Detect operation patterns."""
-        detected = []
+        found = set()
+        total = len(self.operation_patterns)
 
-        for pattern_name, regexes in self.operation_patterns.items():
-            for regex in regexes:
-                if re.search(regex, code, re.IGNORECASE):
-                    detected.append(pattern_name)
-                    break
+        # Single pass over the code, stopping once every category has been seen
+        for match in self._operations_regex.finditer(code):
+            found.add(match.lastgroup)
+            if len(found) == total:
+                break
 
-        return detected
-
-    def _detect_complexity(self, code: str) -> List[str]:
-        """Detect complexity indicators."""
-        indicators = []
-
-        # Line count
-        line_count = len(code.splitlines())
-        if line_count > 100:
-            indicators.append("complex_code")
-        elif line_count > 50:
-            indicators.append("medium_complexity")
-
-        # Loop depth
-        loop_depth = self._get_max_loop_depth(code)
-        if loop_depth > 2:
-            indicators.append("nested_loops")
-
-        # Function count
-        try:
-            tree = ast.parse(code)
-            func_count = sum(1 for node in ast.walk(tree) if isinstance(node, ast.FunctionDef))
-            if func_count > 5:
-                indicators.append("many_functions")
-        except Exception:
-            pass
-
-        return indicators
-
-    def _get_max_loop_depth(self, code: str) -> int:
-        """Get maximum loop nesting depth."""
-        try:
-            tree = ast.parse(code)
-            return self._calculate_loop_depth(tree)
-        except Exception:
-            return 0
-
-    def _calculate_loop_depth(self, node: ast.AST, current_depth: int = 0) -> int:
-        """Recursively calculate loop depth."""
-        max_depth = current_depth
-
-        for child in ast.iter_child_nodes(node):
-            if isinstance(child, (ast.For, ast.While)):
-                child_depth = self._calculate_loop_depth(child, current_depth + 1)
-                max_depth = max(max_depth, child_depth)
-            else:
-                child_depth = self._calculate_loop_depth(child, current_depth)
-                max_depth = max(max_depth, child_depth)
-
-        return max_depth
+        return [name for name in self.operation_patterns if name in found]
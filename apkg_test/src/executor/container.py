@@ -1,18 +1,200 @@
 import asyncio
+import contextlib
+import hashlib
+import io
+import pickle
+import socket
+import struct
+import tarfile
+import threading
 import time
-import os
-import tempfile
-import shutil
-from typing import Dict, Any, AsyncIterator
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, Iterable, List, Mapping, Optional, Set, Tuple
 import structlog
 import docker
-from docker.errors import ImageNotFound
-import aiofiles
+from docker.errors import ImageNotFound, NotFound
+from docker.utils.socket import STDOUT, SocketError, next_frame_header, read_exactly
 
-from ..engine.execution_engine import ExecutionResult, StreamChunk
+from ..a2a.python_agent_pb2 import StreamChunk
+from ..engine.execution_engine import ExecutionResult
 
 logger = structlog.get_logger()
 
+# Source of the persistent worker, started inside containers with ``python -c``
+_WORKER_SOURCE = (Path(__file__).parent / "worker.py").read_text()
+_FRAME_HEADER = struct.Struct(">I")
+_REQUEST_HEADER = struct.Struct(">II")
+# Each run gets its own directory on this tmpfs; see worker.enter_run_dir
+_SANDBOX_ROOT = "/sandbox"
+_POOL_WAIT_SECONDS = 1.0
+# Output chunks buffered between the exec stream and a streaming reader
+_STREAM_QUEUE_CHUNKS = 64
+
+
+def _pump(
+    output: Iterable[bytes],
+    queue: asyncio.Queue,
+    loop: asyncio.AbstractEventLoop,
+    stop: threading.Event,
+):
+    """Move chunks from a blocking Docker output stream onto a bounded asyncio queue.
+
+    Runs on its own thread and blocks while the queue is full, so a slow reader
+    slows the exec down instead of buffering without limit. The stream ends with
+    ``None``, or with the exception that broke it. Once ``stop`` is set the
+    reader is gone and nothing more is queued.
+    """
+    try:
+        for chunk in output:
+            if chunk:
+                asyncio.run_coroutine_threadsafe(queue.put(chunk), loop).result()
+                if stop.is_set():
+                    return
+        end = None
+    except Exception as e:
+        end = e
+    if stop.is_set():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(queue.put(end), loop).result()
+    except RuntimeError:
+        # The loop closed while the exec was still producing output
+        pass
+
+
+def _digest(value: Any) -> bytes:
+    """Fingerprint a value by its protocol-5 pickle, out-of-band buffers included."""
+    buffers: List[pickle.PickleBuffer] = []
+    digest = hashlib.blake2b(
+        pickle.dumps(value, protocol=5, buffer_callback=buffers.append), digest_size=16
+    )
+    for buffer in buffers:
+        with buffer.raw() as view:
+            digest.update(view)
+    return digest.digest()
+
+
+def _context_delta(
+    context: Mapping[str, Any], hashes: Mapping[str, bytes]
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Split a context into entries changed since ``hashes`` and names to delete.
+
+    Only values with a recorded digest are fingerprinted; anything else is sent.
+    """
+    changed = {
+        name: value
+        for name, value in context.items()
+        if name not in hashes or hashes[name] != _digest(value)
+    }
+    deleted = [name for name in hashes if name not in context]
+    return changed, deleted
+
+
+class WorkerCrashed(Exception):
+    """The persistent worker exited or its connection broke mid-request."""
+
+
+class _Worker:
+    """A persistent Python worker process attached to a pooled container.
+
+    Requests and replies are length-prefixed pickles over the exec's stdin and
+    stdout. Docker multiplexes stdout and stderr on the attach socket, so the
+    reader demultiplexes frames and only keeps stdout bytes.
+    """
+
+    def __init__(self, container, sock):
+        self.container = container
+        self.sock = sock
+        self.lock = asyncio.Lock()
+        # Digest of each result the worker last reported, as the session will pass it back
+        self.context_hashes: Dict[str, bytes] = {}
+        self._stdout = bytearray()
+
+    def request(self, payload: bytes, buffers: List[pickle.PickleBuffer]) -> bytes:
+        """Send one request and block until its reply arrives (run in a thread).
+
+        Out-of-band pickle buffers are written straight from the objects' memory.
+        The read has no deadline of its own; the caller enforces one and closes
+        the socket to release this thread.
+        """
+        raw = getattr(self.sock, "_sock", self.sock)
+        try:
+            raw.sendall(_REQUEST_HEADER.pack(len(payload), len(buffers)) + payload)
+            for buffer in buffers:
+                with buffer.raw() as view:
+                    raw.sendall(_FRAME_HEADER.pack(view.nbytes))
+                    raw.sendall(view)
+            (size,) = _FRAME_HEADER.unpack(self._read(_FRAME_HEADER.size))
+            return self._read(size)
+        except (OSError, EOFError) as e:
+            raise WorkerCrashed(str(e)) from e
+
+    def _read(self, size: int) -> bytes:
+        """Read ``size`` bytes of demultiplexed worker stdout."""
+        while len(self._stdout) < size:
+            stream, length = next_frame_header(self.sock)
+            if length < 0:
+                raise EOFError("Worker exited")
+            try:
+                data = read_exactly(self.sock, length)
+            except SocketError as e:
+                # The stream ended part-way through a frame
+                raise EOFError("Worker exited mid-frame") from e
+            # Worker stderr only carries stray output and is dropped
+            if stream == STDOUT:
+                self._stdout += data
+        data = bytes(self._stdout[:size])
+        del self._stdout[:size]
+        return data
+
+    def close(self):
+        """Close stdin, which makes the worker process exit.
+
+        Shutting the socket down first wakes a thread blocked reading from it.
+        """
+        raw = getattr(self.sock, "_sock", self.sock)
+        with contextlib.suppress(OSError):
+            raw.shutdown(socket.SHUT_RDWR)
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+
+
+def _tar_files(files: Mapping[str, bytes], directory: Optional[str] = None) -> bytes:
+    """Build an in-memory tar archive from file names and contents.
+
+    With ``directory`` the files are placed in a world-writable directory of
+    that name, so the unprivileged user in the container can write next to them.
+    """
+    buffer = io.BytesIO()
+    mtime = int(time.time())
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        if directory is not None:
+            info = tarfile.TarInfo(directory)
+            info.type = tarfile.DIRTYPE
+            info.mode = 0o777
+            info.mtime = mtime
+            tar.addfile(info)
+        for name, data in files.items():
+            if directory is not None:
+                name = f"{directory}/{name}"
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o644
+            info.mtime = mtime
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def _untar_file(chunks: Iterable[bytes]) -> bytes:
+    """Extract the single file from a tar stream returned by ``get_archive``."""
+    with tarfile.open(fileobj=io.BytesIO(b"".join(chunks))) as tar:
+        member = tar.next()
+        return tar.extractfile(member).read()
+
 
 class ContainerExecutor:
     """Execute Python code in isolated Docker containers."""
@@ -20,8 +202,15 @@ class ContainerExecutor:
     def __init__(self):
         self.docker_client = docker.from_env()
         self.image_name = "pixell-python-agent:latest"
-        self.container_pool = []
         self.pool_size = 10
+        # Idle containers; containers in use are counted by _live but not queued
+        self._pool: asyncio.Queue = asyncio.Queue(maxsize=self.pool_size)
+        self._live = 0
+        self.max_containers = self.pool_size * 2
+        # Persistent workers bound to sessions, least recently used first
+        self._workers: OrderedDict[str, _Worker] = OrderedDict()
+        self.max_workers = self.pool_size
+        self._closing: Set[asyncio.Task] = set()
         self._init_lock = asyncio.Lock()
         self._initialized = False
 
@@ -40,144 +229,240 @@ class ContainerExecutor:
             self._initialized = True
 
     async def execute(
-        self, code: str, context: Dict[str, Any], resource_tier: int, timeout: int
+        self,
+        code: str,
+        context: Mapping[str, Any],
+        resource_tier: int,
+        timeout: int,
+        session_id: Optional[str] = None,
     ) -> ExecutionResult:
-        """Execute code in container and return results."""
+        """Execute code in container and return results.
+
+        With a ``session_id`` the code runs in that session's persistent worker,
+        so the interpreter, imports and variables stay warm between calls. A
+        one-shot ``main.py`` run is used without a session and as
+        the fallback when a worker crashes.
+        """
         if not self._initialized:
             await self.initialize()
 
-        start_time = time.monotonic()
+        if session_id is not None:
+            try:
+                return await self._execute_in_worker(
+                    session_id, code, context, resource_tier, timeout
+                )
+            except WorkerCrashed as e:
+                logger.warning("Worker crashed, falling back", session_id=session_id, error=str(e))
+            except Exception as e:
+                logger.exception("Worker execution error", session_id=session_id)
+                return ExecutionResult(success=False, error=str(e))
+
         container = None
+        healthy = True
 
         try:
             # Get container from pool or create new
             container = await self._get_container(resource_tier)
 
             # Prepare execution environment
-            work_dir = await self._prepare_workdir(code, context)
+            run_dir = self._new_run_dir()
+            archive = self._build_archive(code, context, run_dir)
 
-            # Execute code
-            result = await self._run_in_container(container, work_dir, timeout)
+            # Execute code, sampling CPU usage on both sides of the run
+            before = await self._sample_stats(container)
+            result = await self._run_in_container(container, archive, run_dir, timeout)
 
             # Parse results
-            execution_result = await self._parse_results(result, work_dir)
+            execution_result = await self._parse_results(result)
 
-            # Calculate metrics
-            execution_time = time.monotonic() - start_time
-            execution_result.memory_used = await self._get_memory_usage(container)
-            execution_result.cpu_percent = await self._get_cpu_usage(container)
+            # Calculate metrics; the server times the whole request itself
+            memory_used, cpu_percent = await self._collect_stats(container, before)
+            execution_result.memory_used = memory_used
+            execution_result.cpu_percent = cpu_percent
 
             return execution_result
 
         except Exception as e:
             logger.exception("Container execution error")
+            healthy = False
             return ExecutionResult(success=False, error=str(e))
         finally:
             # Cleanup
             if container:
-                await self._return_container(container)
-            if "work_dir" in locals():
-                shutil.rmtree(work_dir, ignore_errors=True)
+                await self._return_container(container, healthy)
 
     async def execute_stream(
-        self, code: str, context: Dict[str, Any], resource_tier: int, timeout: int
+        self, code: str, context: Mapping[str, Any], resource_tier: int, timeout: int
     ) -> AsyncIterator[StreamChunk]:
         """Execute code with streaming output."""
         if not self._initialized:
             await self.initialize()
 
         container = None
+        healthy = True
+        # Stays False if the client stops reading before the run finishes
+        done = False
 
         try:
             # Get container
             container = await self._get_container(resource_tier)
 
             # Prepare execution
-            work_dir = await self._prepare_workdir(code, context)
+            run_dir = self._new_run_dir()
+            archive = self._build_archive(code, context, run_dir)
 
             # Stream execution
-            async for chunk in self._stream_execution(container, work_dir, timeout):
+            async for chunk in self._stream_execution(container, archive, run_dir, timeout):
                 yield chunk
+            done = True
 
         except Exception as e:
             logger.exception("Streaming execution error")
+            healthy = False
+            done = True
             yield StreamChunk(
-                type=4,  # ERROR
+                type=StreamChunk.ERROR,
                 data=str(e).encode(),
                 timestamp=int(time.time() * 1000),
             )
         finally:
             if container:
-                await self._return_container(container)
-            if "work_dir" in locals():
-                shutil.rmtree(work_dir, ignore_errors=True)
+                if done:
+                    await self._return_container(container, healthy)
+                else:
+                    # main.py may still be running in it, so it must not be reused
+                    await self._discard_container(container)
+
+    async def _execute_in_worker(
+        self,
+        session_id: str,
+        code: str,
+        context: Mapping[str, Any],
+        resource_tier: int,
+        timeout: int,
+    ) -> ExecutionResult:
+        """Run code in the session's persistent worker."""
+        worker = await self._get_worker(session_id, resource_tier)
+
+        async with worker.lock:
+            # Only ship context the worker does not already hold
+            changed, deleted = _context_delta(context, worker.context_hashes)
+            buffers: List[pickle.PickleBuffer] = []
+            payload = pickle.dumps(
+                {"code": code, "context": changed, "delete": deleted},
+                protocol=5,
+                buffer_callback=buffers.append,
+            )
+            before = await self._sample_stats(worker.container)
+            try:
+                reply = await asyncio.wait_for(
+                    asyncio.to_thread(worker.request, payload, buffers), timeout or None
+                )
+            except TimeoutError:
+                # The worker is stuck in user code, so neither it nor its container
+                # can be reused. Closing the socket releases the blocked thread.
+                self._drop_worker(session_id, worker)
+                await self._discard_container(worker.container)
+                return ExecutionResult(success=False, error=f"Execution timed out after {timeout}s")
+            except WorkerCrashed:
+                self._drop_worker(session_id, worker)
+                await self._discard_container(worker.container)
+                raise
+
+            data = pickle.loads(reply)
+            results = data.get("results", {})
+            # The session stores the results and passes them back as context next
+            # time. Digesting what was reported, rather than what was sent, means
+            # values passed back unchanged are not re-sent, so a repr() placeholder
+            # never overwrites the live object it stands for. A failed run reports
+            # nothing and may have changed anything, so the next call re-sends all.
+            worker.context_hashes = {name: _digest(value) for name, value in results.items()}
+            # Still under the lock, so the CPU window covers only this request
+            memory_used, cpu_percent = await self._collect_stats(worker.container, before)
+
+        execution_result = ExecutionResult(
+            success=data["success"],
+            stdout=data["stdout"],
+            stderr=data["stderr"],
+            results=results,
+            error=None if data["success"] else data.get("error", "Unknown error"),
+        )
+        execution_result.memory_used = memory_used
+        execution_result.cpu_percent = cpu_percent
+        return execution_result
+
+    async def _get_worker(self, session_id: str, resource_tier: int) -> _Worker:
+        """Get the session's worker, starting one in a pooled container if needed."""
+        worker = self._workers.get(session_id)
+        if worker is not None:
+            self._workers.move_to_end(session_id)
+            return worker
+
+        container = await self._get_container(resource_tier)
+        try:
+            exec_result = await asyncio.to_thread(
+                container.exec_run,
+                ["python", "-u", "-c", _WORKER_SOURCE, self._new_run_dir()],
+                stdin=True,
+                socket=True,
+            )
+        except Exception:
+            await self._return_container(container, healthy=False)
+            raise
+        worker = _Worker(container, exec_result.output)
+
+        # A concurrent request for the same session may have won the race
+        existing = self._workers.get(session_id)
+        if existing is not None:
+            worker.close()
+            await self._return_container(container)
+            return existing
+
+        self._workers[session_id] = worker
+        if len(self._workers) > self.max_workers:
+            _, evicted = self._workers.popitem(last=False)
+            task = asyncio.create_task(self._retire_worker(evicted))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        return worker
+
+    def _drop_worker(self, session_id: str, worker: _Worker):
+        """Forget a broken worker and close its connection."""
+        if self._workers.get(session_id) is worker:
+            del self._workers[session_id]
+        worker.close()
+
+    async def _retire_worker(self, worker: _Worker):
+        """Stop an evicted worker once its in-flight request finishes."""
+        async with worker.lock:
+            worker.close()
+        await self._return_container(worker.container)
+
+    async def _discard_container(self, container):
+        """Remove a container for good and release its slot."""
+        self._live -= 1
+        await asyncio.to_thread(self._remove_container, container)
+
+    def _remove_container(self, container):
+        """Force-remove a container that cannot be reused."""
+        try:
+            container.remove(force=True)
+        except Exception:
+            # Container might already be removed
+            pass
 
     async def _ensure_image(self):
-        """Ensure Docker image exists."""
+        """Ensure Docker image exists.
+
+        The image is built ahead of time with docker/build-image.sh; building it
+        here would stall the first request for minutes.
+        """
         try:
-            self.docker_client.images.get(self.image_name)
+            await asyncio.to_thread(self.docker_client.images.get, self.image_name)
         except ImageNotFound:
-            logger.info("Building Docker image", image=self.image_name)
-            await self._build_image()
-
-    async def _build_image(self):
-        """Build Docker image for Python execution."""
-        dockerfile_content = """
-FROM python:3.11-slim
-
-# Install system dependencies
-RUN apt-get update && apt-get install -y \
-    gcc g++ \
-    libhdf5-dev \
-    libatlas-base-dev \
-    gfortran \
-    && rm -rf /var/lib/apt/lists/*
-
-# Install Python packages
-RUN pip install --no-cache-dir \
-    numpy==1.24.3 \
-    pandas==2.0.3 \
-    matplotlib==3.7.2 \
-    scikit-learn==1.3.0 \
-    scipy==1.11.1 \
-    seaborn==0.12.2 \
-    plotly==5.15.0 \
-    polars==0.18.15 \
-    duckdb==0.8.1 \
-    pyarrow==12.0.1 \
-    openpyxl==3.1.2 \
-    xlrd==2.0.1 \
-    requests==2.31.0 \
-    beautifulsoup4==4.12.2 \
-    lxml==4.9.3 \
-    sqlalchemy==2.0.19 \
-    psutil==5.9.5 \
-    tqdm==4.65.0 \
-    joblib==1.3.1 \
-    numba==0.57.1 \
-    cython==3.0.0
-
-# Set working directory
-WORKDIR /workspace
-
-# Set Python to unbuffered mode
-ENV PYTHONUNBUFFERED=1
-
-# Create non-root user
-RUN useradd -m -s /bin/bash runner
-USER runner
-
-CMD ["python"]
-"""
-
-        # Write Dockerfile
-        with tempfile.TemporaryDirectory() as build_dir:
-            dockerfile_path = os.path.join(build_dir, "Dockerfile")
-            with open(dockerfile_path, "w") as f:
-                f.write(dockerfile_content)
-
-            # Build image
-            self.docker_client.images.build(path=build_dir, tag=self.image_name, rm=True)
+            raise RuntimeError(
+                f"Docker image {self.image_name} is missing; build it with docker/build-image.sh"
+            ) from None
 
     async def _warm_pool(self):
         """Pre-warm container pool."""
@@ -185,146 +470,191 @@ CMD ["python"]
 
         for _ in range(self.pool_size):
             container = await self._create_container(0)  # SMALL tier
-            self.container_pool.append(container)
+            self._live += 1
+            self._pool.put_nowait(container)
 
     async def _get_container(self, resource_tier: int):
-        """Get container from pool or create new."""
-        if self.container_pool:
-            return self.container_pool.pop()
+        """Get an idle container, creating one while under the live limit.
+
+        At the limit this waits for another request to return a container, and
+        re-checks the limit periodically in case containers were discarded instead.
+        """
+        while True:
+            try:
+                return self._pool.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+
+            if self._live < self.max_containers:
+                # Reserve the slot before awaiting so concurrent callers see it
+                self._live += 1
+                try:
+                    return await self._create_container(resource_tier)
+                except Exception:
+                    self._live -= 1
+                    raise
 
-        return await self._create_container(resource_tier)
+            try:
+                return await asyncio.wait_for(self._pool.get(), _POOL_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                continue
 
     async def _create_container(self, resource_tier: int):
         """Create new container with resource limits."""
         # Resource configurations
         resources = {
-            0: {"cpu_quota": 100000, "mem_limit": "2g"},  # SMALL
-            1: {"cpu_quota": 200000, "mem_limit": "4g"},  # MEDIUM
-            2: {"cpu_quota": 400000, "mem_limit": "16g"},  # LARGE
+            0: {"cpu_quota": 100000, "mem_limit": "2g", "tmpfs_mb": 512},  # SMALL
+            1: {"cpu_quota": 200000, "mem_limit": "4g", "tmpfs_mb": 2048},  # MEDIUM
+            2: {"cpu_quota": 400000, "mem_limit": "16g", "tmpfs_mb": 8192},  # LARGE
         }
 
-        config = resources.get(resource_tier, resources[0])
+        config = dict(resources.get(resource_tier, resources[0]))
+        # Memory-backed mounts are the only writable surface; the root filesystem is
+        # read-only, so no overlay storage_opt size is needed. tmpfs pages count
+        # against the memory limit, so the mounts split the tier's budget between
+        # them: half for run directories, a quarter each for /tmp and /workspace.
+        tmpfs_mb = config.pop("tmpfs_mb")
 
-        container = self.docker_client.containers.create(
+        def tmpfs_options(share: int, mode: str) -> str:
+            return f"size={tmpfs_mb // share}m,exec,nosuid,nodev,mode={mode}"
+
+        container = await asyncio.to_thread(
+            self.docker_client.containers.create,
             self.image_name,
             command="sleep infinity",
             detach=True,
             remove=True,
             network_mode="none",  # No network access
             read_only=True,  # Read-only root filesystem
-            tmpfs={"/tmp": "size=1G,exec"},  # Writable /tmp
+            tmpfs={
+                "/tmp": tmpfs_options(4, "1777"),
+                "/workspace": tmpfs_options(4, "1777"),
+                # Not sticky, so runs can remove directories put_archive created as root
+                _SANDBOX_ROOT: tmpfs_options(2, "777"),
+            },
             **config,
         )
 
-        container.start()
+        await asyncio.to_thread(container.start)
         return container
 
-    async def _return_container(self, container):
-        """Return container to pool or destroy."""
-        try:
-            # Check if container is healthy
-            container.reload()
-            if container.status == "running" and len(self.container_pool) < self.pool_size:
-                # Clean container state
-                container.exec_run("rm -rf /tmp/*")
-                self.container_pool.append(container)
-            else:
-                container.remove(force=True)
-        except Exception:
-            # Container might already be removed
-            pass
+    async def _return_container(self, container, healthy: bool = True):
+        """Return container to pool or destroy.
 
-    async def _prepare_workdir(self, code: str, context: Dict[str, Any]) -> str:
-        """Prepare working directory with code and context."""
-        work_dir = tempfile.mkdtemp(prefix="ppa_")
+        The container's state is only re-inspected after a Docker error
+        (``healthy=False``); normally a container that just ran fine goes straight
+        back to the pool.
+        """
+        if not healthy:
+            try:
+                await asyncio.to_thread(container.reload)
+                running = container.status == "running"
+            except Exception:
+                # Container might already be removed
+                running = False
+            if not running:
+                await self._discard_container(container)
+                return
 
-        # Write main execution script
+        try:
+            # The next run in this container clears the previous run's directory
+            # and the scratch mounts; see worker.enter_run_dir
+            self._pool.put_nowait(container)
+        except asyncio.QueueFull:
+            await self._discard_container(container)
+
+    def _new_run_dir(self) -> str:
+        """Pick a fresh per-run directory under the sandbox tmpfs."""
+        return f"{_SANDBOX_ROOT}/{uuid.uuid4().hex}"
+
+    def _build_archive(self, code: str, context: Mapping[str, Any], run_dir: str) -> bytes:
+        """Build the archive holding the run directory with script and pickled context.
+
+        It is extracted into the sandbox root, which creates ``run_dir`` on the way.
+        """
+        # Main execution script
         main_script = f"""
-import sys
-import json
-import traceback
-import pickle
+import traceback as _traceback
+import pickle as _pickle
+from worker import collect_results as _collect_results, enter_run_dir as _enter_run_dir
 
-# Load context
-with open('/tmp/context.pkl', 'rb') as f:
-    globals().update(pickle.load(f))
+_enter_run_dir('{run_dir}')
 
-# Capture outputs
-_results = {{}}
+# Load context
+with open('{run_dir}/context.pkl', 'rb') as _f:
+    globals().update(_pickle.load(_f))
 
 try:
     # Execute user code
 {self._indent_code(code)}
-    
+
     # Capture variables
-    for name, value in list(locals().items()):
-        if not name.startswith('_'):
-            try:
-                # Try to serialize for transfer
-                json.dumps(value)
-                _results[name] = value
-            except:
-                # Store string representation
-                _results[name] = str(value)
-    
+    _results = _collect_results(locals())
+
     # Write results
-    with open('/tmp/results.pkl', 'wb') as f:
-        pickle.dump({{'success': True, 'results': _results}}, f)
+    with open('{run_dir}/results.pkl', 'wb') as _f:
+        _pickle.dump({{'success': True, 'results': _results}}, _f, protocol=_pickle.HIGHEST_PROTOCOL)
         
-except Exception as e:
+except Exception as _e:
     # Write error
-    with open('/tmp/results.pkl', 'wb') as f:
-        pickle.dump({{
+    with open('{run_dir}/results.pkl', 'wb') as _f:
+        _pickle.dump({{
             'success': False,
-            'error': str(e),
-            'traceback': traceback.format_exc()
-        }}, f)
+            'error': str(_e),
+            'traceback': _traceback.format_exc()
+        }}, _f)
 """
 
-        script_path = os.path.join(work_dir, "main.py")
-        async with aiofiles.open(script_path, "w") as f:
-            await f.write(main_script)
-
-        # Write context
-        context_path = os.path.join(work_dir, "context.pkl")
-        import pickle
-
-        async with aiofiles.open(context_path, "wb") as f:
-            await f.write(pickle.dumps(context))
-
-        return work_dir
+        return _tar_files(
+            {
+                "main.py": main_script.encode(),
+                # Shared run setup and result collection, imported by main.py
+                "worker.py": _WORKER_SOURCE.encode(),
+                # Flatten layered contexts so shadowed session values are not shipped
+                "context.pkl": pickle.dumps(dict(context), protocol=pickle.HIGHEST_PROTOCOL),
+            },
+            directory=run_dir.rsplit("/", 1)[1],
+        )
 
     def _indent_code(self, code: str, indent: int = 4) -> str:
         """Indent code block."""
         lines = code.splitlines()
         return "\n".join(" " * indent + line for line in lines)
 
-    async def _run_in_container(self, container, work_dir: str, timeout: int) -> Dict[str, Any]:
+    async def _run_in_container(
+        self, container, archive: bytes, run_dir: str, timeout: int
+    ) -> Dict[str, Any]:
         """Run code in container."""
-        # Copy files to container
-        os.system(f"docker cp {work_dir}/. {container.id}:/tmp/")
+        # Copy script and context into the container in-process, off the event loop
+        await asyncio.to_thread(container.put_archive, _SANDBOX_ROOT, archive)
 
         # Execute
-        result = container.exec_run("python /tmp/main.py", stdout=True, stderr=True, demux=True)
+        result = await asyncio.to_thread(
+            container.exec_run, f"python {run_dir}/main.py", stdout=True, stderr=True, demux=True
+        )
 
-        # Copy results back
-        os.system(f"docker cp {container.id}:/tmp/results.pkl {work_dir}/")
+        # Copy results back and unpickle them in the same worker thread hop
+        results = await asyncio.to_thread(self._fetch_results, container, f"{run_dir}/results.pkl")
 
         return {
             "stdout": result.output[0].decode() if result.output[0] else "",
             "stderr": result.output[1].decode() if result.output[1] else "",
             "exit_code": result.exit_code,
+            "results": results,
         }
 
-    async def _parse_results(self, result: Dict[str, Any], work_dir: str) -> ExecutionResult:
-        """Parse execution results."""
-        import pickle
-
-        results_path = os.path.join(work_dir, "results.pkl")
+    def _fetch_results(self, container, path: str) -> Optional[Dict[str, Any]]:
+        """Read and unpickle a results file from the container, or None if missing."""
+        try:
+            chunks, _ = container.get_archive(path)
+        except NotFound:
+            return None
+        return pickle.loads(_untar_file(chunks))
 
-        if os.path.exists(results_path):
-            async with aiofiles.open(results_path, "rb") as f:
-                data = pickle.loads(await f.read())
+    async def _parse_results(self, result: Dict[str, Any]) -> ExecutionResult:
+        """Parse execution results."""
+        if result["results"] is not None:
+            data = result["results"]
 
             if data.get("success"):
                 return ExecutionResult(
@@ -349,50 +679,86 @@ except Exception as e:
             )
 
     async def _stream_execution(
-        self, container, work_dir: str, timeout: int
+        self, container, archive: bytes, run_dir: str, timeout: int
     ) -> AsyncIterator[StreamChunk]:
         """Stream execution output."""
-        # Copy files to container
-        os.system(f"docker cp {work_dir}/. {container.id}:/tmp/")
+        # Copy script and context into the container in-process, off the event loop
+        await asyncio.to_thread(container.put_archive, _SANDBOX_ROOT, archive)
 
         # Start execution
-        exec_id = container.exec_run(
-            "python /tmp/main.py", stdout=True, stderr=True, stream=True, detach=True
+        exec_result = await asyncio.to_thread(
+            container.exec_run, f"python {run_dir}/main.py", stdout=True, stderr=True, stream=True
         )
 
-        # Stream output
-        for output in exec_id.output:
-            if output:
+        # Read the blocking output generator on a thread that feeds a bounded queue
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_STREAM_QUEUE_CHUNKS)
+        stop = threading.Event()
+        threading.Thread(
+            target=_pump, args=(exec_result.output, queue, loop, stop), daemon=True
+        ).start()
+
+        try:
+            # Stream output, merging whatever else is already queued into one chunk
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+
+                parts = [item]
+                while not queue.empty():
+                    item = queue.get_nowait()
+                    if not isinstance(item, bytes):
+                        # Put the sentinel or error back for the outer loop
+                        queue.put_nowait(item)
+                        break
+                    parts.append(item)
+
                 yield StreamChunk(
-                    type=0,  # STDOUT
-                    data=output,
+                    type=StreamChunk.STDOUT,
+                    data=b"".join(parts),
                     timestamp=int(time.time() * 1000),
                 )
-
-    async def _get_memory_usage(self, container) -> int:
-        """Get container memory usage."""
+        finally:
+            # If the reader stopped early, free the slot a blocked pump waits on so
+            # it sees the stop flag and exits
+            stop.set()
+            while not queue.empty():
+                queue.get_nowait()
+
+    async def _sample_stats(self, container) -> dict[str, Any] | None:
+        """Take one stats sample, or None if Docker could not provide it.
+
+        ``one_shot`` returns at once; without it Docker waits about a second to
+        fill in ``precpu_stats``, which the CPU figure does not use.
+        """
         try:
-            stats = container.stats(stream=False)
-            return stats["memory_stats"].get("usage", 0)
+            return await asyncio.to_thread(container.stats, stream=False, one_shot=True)
         except Exception:
-            return 0
+            return None
+
+    async def _collect_stats(self, container, before: dict[str, Any] | None) -> Tuple[int, int]:
+        """Get container memory usage, and CPU percentage since the ``before`` sample."""
+        stats = await self._sample_stats(container)
+        if stats is None:
+            return 0, 0
 
-    async def _get_cpu_usage(self, container) -> int:
-        """Get container CPU usage percentage."""
+        memory_used = stats.get("memory_stats", {}).get("usage", 0)
+        if before is None:
+            return memory_used, 0
         try:
-            stats = container.stats(stream=False)
-            # Calculate CPU percentage
             cpu_delta = (
                 stats["cpu_stats"]["cpu_usage"]["total_usage"]
-                - stats["precpu_stats"]["cpu_usage"]["total_usage"]
+                - before["cpu_stats"]["cpu_usage"]["total_usage"]
             )
             system_delta = (
-                stats["cpu_stats"]["system_cpu_usage"] - stats["precpu_stats"]["system_cpu_usage"]
+                stats["cpu_stats"]["system_cpu_usage"] - before["cpu_stats"]["system_cpu_usage"]
             )
+        except (KeyError, TypeError):
+            return memory_used, 0
 
-            if system_delta > 0:
-                cpu_percent = (cpu_delta / system_delta) * 100
-                return int(cpu_percent)
-            return 0
-        except Exception:
-            return 0
+        if system_delta > 0:
+            return memory_used, int((cpu_delta / system_delta) * 100)
+        return memory_used, 0
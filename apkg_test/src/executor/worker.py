@@ -0,0 +1,193 @@
+"""Persistent execution worker that runs inside a pooled container.
+
+Reads pickled ``{"code", "context", "delete"}`` requests from stdin, executes each one
+against a globals dict that persists across requests, and writes
+length-prefixed pickled replies to stdout. A request is a ``(size, count)``
+header, the protocol-5 pickle, then ``count`` length-prefixed out-of-band
+buffers so large arrays are not copied into the pickle stream. Only the standard library is
+used: the host ships this file as source and starts it with ``python -c``.
+"""
+
+import contextlib
+import io
+import json
+import os
+import pickle
+import shutil
+import struct
+import sys
+import tempfile
+import traceback
+import types
+
+_HEADER = struct.Struct(">I")
+_REQUEST_HEADER = struct.Struct(">II")
+
+
+def read_request(stream):
+    """Read one request, or None once the host closes stdin."""
+    header = stream.read(_REQUEST_HEADER.size)
+    if len(header) < _REQUEST_HEADER.size:
+        return None
+    size, count = _REQUEST_HEADER.unpack(header)
+    data = stream.read(size)
+
+    buffers = []
+    for _ in range(count):
+        (length,) = _HEADER.unpack(stream.read(_HEADER.size))
+        # Writable buffers, so arrays rebuilt on top of them stay mutable
+        buffer = bytearray(length)
+        stream.readinto(buffer)
+        buffers.append(buffer)
+    return pickle.loads(data, buffers=buffers)
+
+
+def write_frame(stream, payload):
+    """Write one length-prefixed frame."""
+    stream.write(_HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+# Values passed back as-is; they map directly onto msgpack types
+_SCALAR_TYPES = (type(None), bool, int, float, str, bytes)
+_CONTAINER_TYPES = (list, tuple, dict)
+# Imports, functions and classes are namespace plumbing, not results
+_SKIPPED_TYPES = (types.ModuleType, types.FunctionType, types.BuiltinFunctionType, type)
+_MAX_REPR = 1024
+# Writable scratch mounts that runs share with whoever used the container before
+_SCRATCH_DIRS = ("/tmp", "/workspace")
+
+
+def _empty_dir(path, keep=None):
+    """Remove everything inside ``path`` except the entry at ``keep``."""
+    try:
+        entries = list(os.scandir(path))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.path == keep:
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+
+def enter_run_dir(run_dir):
+    """Make ``run_dir`` the working and temp directory of this process.
+
+    Whatever earlier runs in this container left behind, sibling run
+    directories and files in the shared scratch mounts, is removed here, in a
+    process that is starting anyway. Returning a container to the pool needs
+    no cleanup exec, and no run can read another session's files.
+    """
+    _empty_dir(os.path.dirname(run_dir), keep=run_dir)
+    for path in _SCRATCH_DIRS:
+        _empty_dir(path)
+    os.makedirs(run_dir, exist_ok=True)
+    os.chdir(run_dir)
+    os.environ["TMPDIR"] = run_dir
+    tempfile.tempdir = run_dir
+
+
+def _is_plain(value):
+    """Whether a container holds only JSON-compatible values."""
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def collect_results(namespace, placeholders=None):
+    """Collect public variables, dispatching on type.
+
+    Scalars are returned as-is and plain containers after a JSON check. Anything
+    else, e.g. arrays and DataFrames, is returned as a truncated repr() without
+    ever being walked by an encoder. If ``placeholders`` is given it is refilled
+    with the repr() returned for each such name.
+    """
+    if placeholders is not None:
+        placeholders.clear()
+    results = {}
+    for name, value in list(namespace.items()):
+        if name.startswith("_") or isinstance(value, _SKIPPED_TYPES):
+            continue
+        if isinstance(value, _SCALAR_TYPES):
+            results[name] = value
+        elif isinstance(value, _CONTAINER_TYPES) and _is_plain(value):
+            results[name] = value
+        else:
+            results[name] = repr(value)[:_MAX_REPR]
+            if placeholders is not None:
+                placeholders[name] = results[name]
+    return results
+
+
+def run(request, namespace, placeholders):
+    """Execute one request against the persistent namespace.
+
+    ``context`` only holds entries that changed since the previous request and
+    ``delete`` names the entries the host no longer sends. ``placeholders`` maps
+    names to the repr() last reported for them; a context entry equal to its
+    placeholder is that report coming back, and must not replace the live value.
+    """
+    for name in request.get("delete", ()):
+        namespace.pop(name, None)
+        placeholders.pop(name, None)
+    for name, value in request["context"].items():
+        if name in namespace and isinstance(value, str) and placeholders.get(name) == value:
+            continue
+        namespace[name] = value
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exec(compile(request["code"], "<code>", "exec"), namespace)
+        reply = {"success": True, "results": collect_results(namespace, placeholders)}
+    except (Exception, SystemExit) as e:
+        reply = {"success": False, "error": str(e), "traceback": traceback.format_exc()}
+
+    reply["stdout"] = stdout.getvalue()
+    reply["stderr"] = stderr.getvalue()
+    return reply
+
+
+def main():
+    if len(sys.argv) > 1:
+        enter_run_dir(sys.argv[1])
+
+    stdin = sys.stdin.buffer
+    # Keep the protocol stream private: anything else written to fd 1, e.g. by a
+    # subprocess started from user code, lands on stderr instead
+    out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+
+    namespace = {"__name__": "__main__"}
+    placeholders = {}
+    while True:
+        request = read_request(stdin)
+        if request is None:
+            break
+
+        reply = run(request, namespace, placeholders)
+        try:
+            payload = pickle.dumps(reply, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            payload = pickle.dumps(
+                {
+                    "success": False,
+                    "error": f"Could not serialize results: {e}",
+                    "stdout": reply["stdout"],
+                    "stderr": reply["stderr"],
+                }
+            )
+        write_frame(out, payload)
+
+
+if __name__ == "__main__":
+    main()
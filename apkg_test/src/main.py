@@ -1,50 +1,95 @@
 import asyncio
 import argparse
+import logging
+import os
 import signal
 import sys
 from typing import Optional
+import orjson
 import structlog
 
-from .a2a.server import serve as serve_grpc
+from .a2a.server import new_event_loop, serve as serve_grpc
 from .sessions.manager import SessionManager
 
-# Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.dev.ConsoleRenderer(),
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
-    cache_logger_on_first_use=True,
-)
+
+def configure_logging(level: int = logging.INFO):
+    """Configure structlog to render JSON lines with orjson.
+
+    The filtering bound logger turns calls below ``level`` into no-ops, so
+    debug logs on the request path cost nothing unless enabled.
+    """
+    structlog.configure(
+        processors=[
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(serializer=orjson.dumps),
+        ],
+        context_class=dict,
+        logger_factory=structlog.BytesLoggerFactory(file=sys.stderr.buffer),
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        cache_logger_on_first_use=True,
+    )
+
+
+configure_logging()
 
 logger = structlog.get_logger()
 
 # Global session manager
 session_manager: Optional[SessionManager] = None
 
-
-async def shutdown(sig: signal.Signals):
-    """Graceful shutdown handler."""
+# PIDs of the worker processes forked by this one; empty in the workers themselves
+_child_pids: list[int] = []
+_children_signalled = False
+
+
+def _signal_children(sig: signal.Signals):
+    """Pass a shutdown signal on to the forked workers, once."""
+    global _children_signalled
+    if _children_signalled:
+        return
+    _children_signalled = True
+    for pid in _child_pids:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            # Already exited; reaped below
+            pass
+
+
+def _reap_children():
+    """Stop the forked workers if they are still running and wait for them to exit."""
+    _signal_children(signal.SIGTERM)
+    for pid in _child_pids:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
+
+def _on_signal(sig: signal.Signals, task: asyncio.Task):
+    """Signal handler run by the event loop: stop serving by cancelling main.
+
+    A second signal, e.g. Ctrl-C reaching a worker both directly and through
+    the parent, does not interrupt the shutdown already under way.
+    """
     logger.info("Received shutdown signal", signal=sig.name)
+    _signal_children(sig)
+    if not task.cancelling():
+        task.cancel()
+
 
+async def shutdown():
+    """Graceful shutdown handler.
+
+    Only our own background work is stopped here; the runner cancels any
+    remaining tasks and finalizes async generators when it closes the loop.
+    """
     if session_manager:
         await session_manager.stop()
 
-    # Cancel all running tasks
-    tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
-    for task in tasks:
-        task.cancel()
-
-    await asyncio.gather(*tasks, return_exceptions=True)
     logger.info("Shutdown complete")
 
 
@@ -52,6 +97,15 @@ async def main(args):
     """Main entry point."""
     global session_manager
 
+    # Signals are delivered through the running loop, so shutdown always has one
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, _on_signal, sig, asyncio.current_task())
+        except NotImplementedError:
+            # Windows event loops have no signal handler support
+            pass
+
     # Initialize session manager
     session_manager = SessionManager()
     await session_manager.start()
@@ -60,11 +114,17 @@ async def main(args):
     logger.info("Starting Pixell Python Agent", port=args.port, use_unix_socket=args.unix_socket)
 
     try:
-        await serve_grpc(port=args.port, use_unix_socket=args.unix_socket)
-    except KeyboardInterrupt:
-        logger.info("Received keyboard interrupt")
+        await serve_grpc(
+            port=args.port,
+            use_unix_socket=args.unix_socket,
+            session_manager=session_manager,
+            lookahead_bytes=args.lookahead_bytes,
+            write_buffer_bytes=args.write_buffer_bytes,
+        )
+    except asyncio.CancelledError:
+        pass
     finally:
-        await shutdown(signal.SIGTERM)
+        await shutdown()
 
 
 def run():
@@ -78,27 +138,54 @@ def run():
     parser.add_argument(
         "--tcp", dest="unix_socket", action="store_false", help="Use TCP instead of Unix socket"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes sharing the TCP port via SO_REUSEPORT (default: 1); "
+        "sessions are kept per worker",
+    )
+    parser.add_argument(
+        "--lookahead-bytes",
+        type=int,
+        default=8 * 1024 * 1024,
+        help="HTTP/2 receive window in bytes (default: 8MB)",
+    )
+    parser.add_argument(
+        "--write-buffer-bytes",
+        type=int,
+        default=1024 * 1024,
+        help="Transport write buffer in bytes (default: 1MB)",
+    )
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
 
     args = parser.parse_args()
 
+    if args.workers > 1 and args.unix_socket:
+        parser.error("--workers requires --tcp")
+
     # Set log level
     if args.debug:
-        structlog.configure(
-            wrapper_class=structlog.stdlib.BoundLogger,
-            logger_factory=lambda: structlog.PrintLogger(file=sys.stderr),
-            cache_logger_on_first_use=False,
-        )
-
-    # Setup signal handlers
-    for sig in (signal.SIGTERM, signal.SIGINT):
-        signal.signal(sig, lambda s, f: asyncio.create_task(shutdown(s)))
+        configure_logging(logging.DEBUG)
+
+    # Fork extra workers before any event loop exists; the kernel balances
+    # incoming connections across the processes bound with SO_REUSEPORT. The
+    # parent serves too, and forwards shutdown signals to the workers it forked.
+    for _ in range(args.workers - 1):
+        pid = os.fork()
+        if pid == 0:
+            _child_pids.clear()
+            break
+        _child_pids.append(pid)
 
     # Run main
     try:
-        asyncio.run(main(args))
+        with asyncio.Runner(loop_factory=new_event_loop) as runner:
+            runner.run(main(args))
     except KeyboardInterrupt:
         pass
+    finally:
+        _reap_children()
 
 
 if __name__ == "__main__":
@@ -8,15 +8,34 @@ while maintaining the A2A gRPC service as the primary interface.
 import json
 import sys
 import os
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Optional
 
 import grpc
+import msgspec
 from .a2a import python_agent_pb2
 from .a2a import python_agent_pb2_grpc
 
+_encoder = msgspec.msgpack.Encoder()
+_decoder = msgspec.msgpack.Decoder()
+
+# Keep the connection to the local service warm between requests
+_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.keepalive_timeout_ms", 10_000),
+    ("grpc.keepalive_permit_without_calls", 1),
+]
+
 
 class PixellAdapter:
-    """Adapter to make the A2A agent compatible with Pixell Kit."""
+    """Adapter to make the A2A agent compatible with Pixell Kit.
+
+    All adapters in a process share one channel, so a long-lived host pays the
+    connection setup once rather than per request.
+    """
+
+    _channel: Optional[grpc.Channel] = None
+    _channel_lock = threading.Lock()
 
     def __init__(self):
         self.channel = None
@@ -25,17 +44,33 @@ class PixellAdapter:
 
     def connect(self):
         """Connect to the local A2A service."""
-        # Check if service is running locally
-        socket_path = "/tmp/pixell-python-agent-50051.sock"
-        if os.path.exists(socket_path):
-            self.channel = grpc.insecure_channel(f"unix://{socket_path}")
-        else:
-            # Fallback to TCP
-            port = os.environ.get("A2A_PORT", "50051")
-            self.channel = grpc.insecure_channel(f"localhost:{port}")
-
+        self.channel = self._get_channel()
         self.stub = python_agent_pb2_grpc.PythonAgentStub(self.channel)
 
+    @classmethod
+    def _get_channel(cls) -> grpc.Channel:
+        """Get the process-wide channel, creating it on first use."""
+        with cls._channel_lock:
+            if cls._channel is None:
+                # Check if service is running locally
+                socket_path = "/tmp/pixell-python-agent-50051.sock"
+                if os.path.exists(socket_path):
+                    target = f"unix://{socket_path}"
+                else:
+                    # Fallback to TCP
+                    port = os.environ.get("A2A_PORT", "50051")
+                    target = f"localhost:{port}"
+                cls._channel = grpc.insecure_channel(target, options=_CHANNEL_OPTIONS)
+            return cls._channel
+
+    @classmethod
+    def close_channel(cls):
+        """Close the shared channel; the next adapter reconnects."""
+        with cls._channel_lock:
+            if cls._channel is not None:
+                cls._channel.close()
+                cls._channel = None
+
     def process_request(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Process request in Pixell Kit format."""
         action = data.get("action", "execute")
@@ -63,25 +98,16 @@ class PixellAdapter:
             # Add context if provided
             context = data.get("context", {})
             if context:
-                import msgpack
-
-                for key, value in context.items():
-                    request.context[key] = msgpack.packb(value, use_bin_type=True)
+                request.context.update(
+                    {key: _encoder.encode(value) for key, value in context.items()}
+                )
 
             # Execute
             response = self.stub.Execute(request)
 
             # Format response
             if response.success:
-                results = {}
-                if response.results:
-                    import msgpack
-
-                    for key, value in response.results.items():
-                        try:
-                            results[key] = msgpack.unpackb(value, raw=False)
-                        except Exception:
-                            results[key] = value
+                results = self._unpack_results(response.results)
 
                 return {
                     "status": "success",
@@ -161,15 +187,31 @@ class PixellAdapter:
             },
         }
 
+    def _unpack_results(self, packed) -> Dict[str, Any]:
+        """Decode msgpack result values, keeping undecodable ones as raw bytes."""
+        try:
+            return {key: _decoder.decode(value) for key, value in packed.items()}
+        except msgspec.DecodeError:
+            results = {}
+            for key, value in packed.items():
+                try:
+                    results[key] = _decoder.decode(value)
+                except msgspec.DecodeError:
+                    results[key] = value
+            return results
+
     def _get_resource_tier(self, resource: str) -> int:
         """Convert resource string to tier number."""
         tiers = {"small": 0, "medium": 1, "large": 2}
         return tiers.get(resource.lower(), 0)
 
     def cleanup(self):
-        """Clean up resources."""
-        if self.channel:
-            self.channel.close()
+        """Clean up resources.
+
+        The shared channel is left open for other adapters; see close_channel().
+        """
+        self.channel = None
+        self.stub = None
 
 
 def main():
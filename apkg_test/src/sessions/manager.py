@@ -1,6 +1,6 @@
 import asyncio
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 import structlog
 from collections import OrderedDict
@@ -20,92 +20,152 @@ class Session:
     last_code: str = ""
     last_error: Optional[str] = None
 
-    def update_accessed(self):
-        """Update last accessed timestamp."""
-        self.last_accessed = int(time.time())
+    def update_accessed(self, now: Optional[int] = None):
+        """Update last accessed timestamp, to ``now`` when the caller has it."""
+        self.last_accessed = int(time.time()) if now is None else now
+
+
+_SHARD_COUNT = 16
 
 
 class SessionManager:
-    """In-memory session management with LRU eviction."""
+    """In-memory session management with LRU eviction.
+
+    Sessions are split across independent shards, each with its own LRU order
+    and lock, so inserts and sweeps in one shard never block another. Lookups
+    of existing sessions take no lock at all. ``max_sessions`` limits the
+    manager as a whole; at the limit the least recently used session of any
+    shard is evicted.
+    """
 
     def __init__(self, max_sessions: int = 1000, ttl_seconds: int = 5400):  # 90 min TTL
-        self.sessions: OrderedDict[str, Session] = OrderedDict()
+        self._shards: List[OrderedDict[str, Session]] = [OrderedDict() for _ in range(_SHARD_COUNT)]
+        self._locks = [asyncio.Lock() for _ in range(_SHARD_COUNT)]
         self.max_sessions = max_sessions
+        # Sessions held across all shards
+        self._count = 0
         self.ttl_seconds = ttl_seconds
-        self._lock = asyncio.Lock()
         self._cleanup_task = None
+        # Wall-clock seconds, refreshed once a second by _clock_loop while started
+        self._now = int(time.time())
+        self._clock_task = None
+
+    def _shard_index(self, session_id: str) -> int:
+        return hash(session_id) & (_SHARD_COUNT - 1)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _time(self) -> int:
+        """Current time in whole seconds, from the tick cache once started."""
+        if self._clock_task is None:
+            return int(time.time())
+        return self._now
 
     async def start(self):
-        """Start background cleanup task."""
+        """Start background clock and cleanup tasks."""
+        if not self._clock_task:
+            self._now = int(time.time())
+            self._clock_task = asyncio.create_task(self._clock_loop())
         if not self._cleanup_task:
             self._cleanup_task = asyncio.create_task(self._cleanup_loop())
 
     async def stop(self):
-        """Stop background cleanup task."""
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
+        """Stop background clock and cleanup tasks."""
+        for task in (self._cleanup_task, self._clock_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._cleanup_task = None
+        self._clock_task = None
 
     async def get_or_create(self, session_id: str) -> Session:
         """Get existing session or create new one."""
-        async with self._lock:
-            if session_id in self.sessions:
-                # Move to end (most recently used)
-                session = self.sessions.pop(session_id)
-                session.update_accessed()
-                self.sessions[session_id] = session
+        session = await self.get(session_id)
+        if session is not None:
+            return session
+
+        index = self._shard_index(session_id)
+        shard = self._shards[index]
+        async with self._locks[index]:
+            # Another request may have created it while we waited for the lock
+            session = shard.get(session_id)
+            if session is not None:
+                shard.move_to_end(session_id)
+                session.update_accessed(self._time())
                 return session
 
             # Create new session
-            session = Session(session_id=session_id)
+            now = self._time()
+            session = Session(session_id=session_id, created_at=now, last_accessed=now)
 
             # Evict oldest if at capacity
-            if len(self.sessions) >= self.max_sessions:
-                oldest_id = next(iter(self.sessions))
-                del self.sessions[oldest_id]
-                logger.info("Evicted oldest session", session_id=oldest_id)
+            if self._count >= self.max_sessions:
+                self._evict_oldest()
 
-            self.sessions[session_id] = session
-            logger.info("Created new session", session_id=session_id)
+            shard[session_id] = session
+            self._count += 1
+            logger.debug("Created new session", session_id=session_id)
             return session
 
+    def _evict_oldest(self):
+        """Evict the least recently used session across all shards.
+
+        Each shard's first session is its least recently used, so the global one
+        is the oldest of at most ``_SHARD_COUNT`` heads. Nothing awaits here, so
+        other shards are modified without taking their locks, as in ``get``.
+        """
+        oldest_shard = min(
+            (shard for shard in self._shards if shard),
+            key=lambda shard: next(iter(shard.values())).last_accessed,
+            default=None,
+        )
+        if oldest_shard is None:
+            return
+        oldest_id, _ = oldest_shard.popitem(last=False)
+        self._count -= 1
+        logger.debug("Evicted oldest session", session_id=oldest_id)
+
     async def get(self, session_id: str) -> Optional[Session]:
         """Get existing session or None."""
-        async with self._lock:
-            if session_id in self.sessions:
-                session = self.sessions.pop(session_id)
-                session.update_accessed()
-                self.sessions[session_id] = session
-                return session
-            return None
+        shard = self._shards[self._shard_index(session_id)]
+        session = shard.get(session_id)
+        if session is not None:
+            # Nothing awaits between the lookup and the reorder, so no lock is needed
+            shard.move_to_end(session_id)
+            session.update_accessed(self._time())
+        return session
 
     async def update_variables(self, session_id: str, variables: Dict[str, Any]):
         """Update session variables."""
         session = await self.get(session_id)
         if session:
-            async with self._lock:
-                session.variables.update(variables)
-                session.update_accessed()
+            session.variables.update(variables)
 
     async def get_stats(self) -> Dict[str, Any]:
         """Get session manager statistics."""
-        async with self._lock:
-            return {
-                "active_sessions": len(self.sessions),
-                "max_sessions": self.max_sessions,
-                "ttl_seconds": self.ttl_seconds,
-                "oldest_session_age": self._get_oldest_age(),
-            }
+        return {
+            "active_sessions": len(self),
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl_seconds,
+            "oldest_session_age": self._get_oldest_age(),
+        }
 
     def _get_oldest_age(self) -> Optional[int]:
         """Get age of oldest session in seconds."""
-        if not self.sessions:
+        oldest = [next(iter(shard.values())).last_accessed for shard in self._shards if shard]
+        if not oldest:
             return None
-        oldest = next(iter(self.sessions.values()))
-        return int(time.time()) - oldest.last_accessed
+        return self._time() - min(oldest)
+
+    async def _clock_loop(self):
+        """Background task refreshing the cached time once a second."""
+        while True:
+            await asyncio.sleep(1)
+            self._now = int(time.time())
 
     async def _cleanup_loop(self):
         """Background task to clean up expired sessions."""
@@ -119,18 +179,25 @@ class SessionManager:
                 logger.exception("Error in cleanup loop", error=str(e))
 
     async def _cleanup_expired(self):
-        """Remove sessions that have exceeded TTL."""
-        current_time = int(time.time())
-        expired = []
-
-        async with self._lock:
-            for session_id, session in self.sessions.items():
-                if current_time - session.last_accessed > self.ttl_seconds:
-                    expired.append(session_id)
-
-            for session_id in expired:
-                del self.sessions[session_id]
-                logger.info("Cleaned up expired session", session_id=session_id)
-
-        if expired:
-            logger.info("Cleaned up sessions", count=len(expired))
+        """Remove sessions that have exceeded TTL.
+
+        Every access moves a session to the end of its shard, so each shard is
+        ordered by ``last_accessed`` and doubles as an expiry index: the sweep
+        costs O(expired + shards) and never visits a live session past the first.
+        """
+        current_time = self._time()
+        count = 0
+
+        for shard, lock in zip(self._shards, self._locks):
+            async with lock:
+                while shard:
+                    session_id, session = next(iter(shard.items()))
+                    if current_time - session.last_accessed <= self.ttl_seconds:
+                        break
+                    del shard[session_id]
+                    self._count -= 1
+                    count += 1
+                    logger.debug("Cleaned up expired session", session_id=session_id)
+
+        if count:
+            logger.info("Cleaned up sessions", count=count)
@@ -0,0 +1,155 @@
+"""Tests for the persistent worker and the host's context delta."""
+
+import asyncio
+import pickle
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+from src.executor import worker
+
+
+def _request(code, context=None, delete=()):
+    return {"code": code, "context": context or {}, "delete": list(delete)}
+
+
+def test_placeholder_does_not_replace_live_value():
+    namespace = {"__name__": "__main__"}
+    placeholders = {}
+
+    reply = worker.run(_request("s = {1, 2, 3}"), namespace, placeholders)
+    assert reply["results"]["s"] == "{1, 2, 3}"
+
+    # The session passes the reported repr() back as context
+    reply = worker.run(
+        _request("s.add(4)\nn = len(s)", {"s": reply["results"]["s"]}), namespace, placeholders
+    )
+    assert reply["success"], reply.get("error")
+    assert reply["results"]["n"] == 4
+
+
+def test_changed_string_replaces_live_value():
+    namespace = {"__name__": "__main__"}
+    placeholders = {}
+
+    worker.run(_request("s = {1, 2, 3}"), namespace, placeholders)
+    reply = worker.run(_request("t = type(s).__name__", {"s": "new"}), namespace, placeholders)
+    assert reply["results"]["t"] == "str"
+
+
+class _InProcessWorker:
+    """Stands in for a container worker by running requests in this process."""
+
+    def __init__(self):
+        self.container = _NoStatsContainer()
+        self.lock = asyncio.Lock()
+        self.context_hashes = {}
+        self.sent = []
+        self._namespace = {"__name__": "__main__"}
+        self._placeholders = {}
+
+    def request(self, payload, buffers):
+        request = pickle.loads(payload, buffers=[bytes(b.raw()) for b in buffers])
+        self.sent.append(request["context"])
+        reply = worker.run(request, self._namespace, self._placeholders)
+        return pickle.dumps(reply)
+
+
+class _HungWorker:
+    """A worker stuck in user code: it never replies until its socket is closed."""
+
+    def __init__(self):
+        self.container = _NoStatsContainer()
+        self.lock = asyncio.Lock()
+        self.context_hashes = {}
+        self.closed = threading.Event()
+
+    def request(self, payload, buffers):
+        self.closed.wait()
+        raise OSError("Socket closed")
+
+    def close(self):
+        self.closed.set()
+
+
+class _NoStatsContainer:
+    def __init__(self):
+        self.removed = False
+
+    def stats(self, **kwargs):
+        raise RuntimeError("no stats outside Docker")
+
+    def remove(self, force=False):
+        self.removed = True
+
+
+def _executor_with(session_id, fake):
+    from src.executor.container import ContainerExecutor
+
+    executor = ContainerExecutor.__new__(ContainerExecutor)
+    executor._initialized = True
+    executor._live = 1
+    executor._workers = OrderedDict({session_id: fake})
+    return executor
+
+
+def _importorskip_host():
+    pytest.importorskip("docker")
+    pytest.importorskip("structlog")
+    pytest.importorskip("grpc")
+
+
+async def test_non_plain_variable_survives_two_calls():
+    _importorskip_host()
+    fake = _InProcessWorker()
+    executor = _executor_with("session-1", fake)
+
+    session_variables = {}
+    result = await executor.execute("s = {1, 2, 3}", session_variables, 0, 5, "session-1")
+    assert result.success, result.error
+    session_variables.update(result.results)
+
+    result = await executor.execute("s.add(4)\nn = len(s)", session_variables, 0, 5, "session-1")
+    assert result.success, result.error
+    assert result.results["n"] == 4
+    # The placeholder the session passed back was recognised as unchanged
+    assert fake.sent[1] == {}
+
+
+async def test_hung_worker_times_out():
+    _importorskip_host()
+    fake = _HungWorker()
+    executor = _executor_with("session-1", fake)
+
+    start = time.monotonic()
+    result = await executor.execute("while True: pass", {}, 0, 1, "session-1")
+    assert time.monotonic() - start < 2
+    assert not result.success
+    assert result.error == "Execution timed out after 1s"
+    # The stuck worker is released and neither it nor its container is reused
+    assert fake.closed.is_set()
+    assert fake.container.removed
+    assert "session-1" not in executor._workers
+
+
+async def test_worker_closing_mid_frame_is_dropped():
+    _importorskip_host()
+    from src.executor.container import WorkerCrashed, _Worker
+
+    host, container_side = socket.socketpair()
+    fake = _Worker(_NoStatsContainer(), host)
+    executor = _executor_with("session-1", fake)
+
+    # A stdout frame announcing 16 bytes, of which only 4 arrive
+    container_side.sendall(struct.pack(">BxxxL", 1, 16) + b"\x00\x00\x00\x0c")
+    # The worker still reads the request, but its output ends there
+    container_side.shutdown(socket.SHUT_WR)
+
+    with pytest.raises(WorkerCrashed):
+        await executor._execute_in_worker("session-1", "x = 1", {}, 0, 5)
+    container_side.close()
+    assert fake.container.removed
+    assert "session-1" not in executor._workers
@@ -1,8 +1,8 @@
-import json
+import os
 import sys
-from pathlib import Path
+from functools import lru_cache
 
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from pixell.ui import (
     UISpec,
@@ -14,18 +14,19 @@ from pixell.ui import (
 )
 
 
+@lru_cache(maxsize=1)
 def build_spec() -> UISpec:
-    return UISpec(
-        manifest=Manifest(
+    return UISpec.model_construct(
+        manifest=Manifest.model_construct(
             id="ex.v1", name="Ex", version="1.0.0", capabilities=["page", "table", "list"]
         ),
         data={"rows": [{"title": "A"}, {"title": "B"}]},
         actions={},
-        view=View(
+        view=View.model_construct(
             type="page",
             title="Cap Downgrade",
             children=[
-                Component(
+                Component.model_construct(
                     type="table",
                     props={
                         "data": "@rows",
@@ -42,11 +43,17 @@ def build_spec() -> UISpec:
     )
 
 
-def main() -> None:
-    spec = build_spec()
+@lru_cache(maxsize=1)
+def adapted_spec_json() -> str:
+    """Adapt the spec to a list-only client and serialize it once."""
     caps = ClientCapabilities(components=["page", "list"], streaming=False, specVersion="1.0.0")
-    adapted = adapt_view_for_capabilities(spec, caps)
-    print(json.dumps(adapted.model_dump(mode="json"), indent=2))
+    # adapt_view_for_capabilities replaces spec.view, so keep the cached spec intact
+    adapted = adapt_view_for_capabilities(build_spec().model_copy(), caps)
+    return adapted.model_dump_json(indent=2)
+
+
+def main() -> None:
+    print(adapted_spec_json())
 
 
 if __name__ == "__main__":
@@ -1,37 +1,113 @@
+import http.client
 import json
+import os
 import sys
-from pathlib import Path
-import urllib.request
-import urllib.error
+from urllib.parse import urlsplit
 
 # Allow running from repo without installing the package
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from pixell.protocol import UiEvent, ActionResult, validate_envelope, validate_outbound_if_dev
-from pixell.intent import IntentResult
+from pixell.protocol import UiEvent, validate_envelope, validate_outbound_if_dev
 from pixell.intent.policy import IntentPolicy
 from pixell.intent.rate_limit import RateLimiter
 
+try:
+    import orjson
+
+    def _dumps(obj, pretty: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None).decode()
+
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+
+    def _dumps(obj, pretty: bool = False) -> str:
+        if pretty:
+            return json.dumps(obj, indent=2)
+        return json.dumps(obj, separators=(",", ":"))
+
+
 # Persist limiter across calls for demo rate limiting
 RATE_LIMITER = RateLimiter(max_calls=5, per_seconds=60)
 
+# The allow-list never changes, so build the policy once
+_POLICY = IntentPolicy(allowed=("fetch_status",))
+_is_allowed = _POLICY.is_allowed
+
+# Keep-alive connections reused across calls, keyed by (scheme, host, port)
+_CONNECTIONS: dict = {}
+
+
+def _http_get(url: str, timeout: float) -> http.client.HTTPResponse:
+    """Send a GET over a pooled keep-alive connection, reconnecting once if it went stale."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise ValueError(f"Unsupported URL scheme: {parts.scheme!r}")
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    key = (parts.scheme, parts.hostname, parts.port)
+
+    conn = _CONNECTIONS.get(key)
+    if conn is not None:
+        try:
+            conn.request("GET", path)
+            return conn.getresponse()
+        except (ConnectionError, http.client.HTTPException):
+            # The server closed the idle connection; fall through to a fresh one
+            conn.close()
+
+    if parts.scheme == "https":
+        conn = http.client.HTTPSConnection(parts.hostname, parts.port, timeout=timeout)
+    else:
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+    _CONNECTIONS[key] = conn
+    try:
+        conn.request("GET", path)
+        return conn.getresponse()
+    except Exception:
+        conn.close()
+        del _CONNECTIONS[key]
+        raise
+
 
 def perform_http_get(url: str, timeout: float = 5.0) -> dict:
-    """Make a simple GET request without external deps (urllib)."""
-    req = urllib.request.Request(url, method="GET")
+    """Make a simple GET request without external deps (http.client)."""
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            body = resp.read()
-            return {
-                "status_code": resp.status,
-                "headers": dict(resp.getheaders()),
-                "length": len(body),
-            }
-    except urllib.error.HTTPError as e:
-        return {"status_code": e.code, "error": str(e)}
+        resp = _http_get(url, timeout)
+        # Count the body as it streams in; it must be drained to reuse the connection
+        length = 0
+        while chunk := resp.read(65536):
+            length += len(chunk)
     except Exception as e:
         return {"status_code": None, "error": str(e)}
 
+    if resp.status >= 400:
+        return {"status_code": resp.status, "error": f"HTTP Error {resp.status}: {resp.reason}"}
+    return {"status_code": resp.status, "length": length}
+
+
+def _result_envelope(
+    status: str,
+    intent: str,
+    message: str,
+    trace_id: str | None,
+    details: dict | None = None,
+) -> dict:
+    """Build an ``action.result`` envelope directly.
+
+    The envelope has a fixed shape and is checked against the schema in dev
+    mode, so going through ``ActionResult(...).model_dump()`` only adds cost.
+    """
+    return {
+        "type": "action.result",
+        "action": None,
+        "intent": intent,
+        "status": status,
+        "message": message,
+        "details": details,
+        "patch": None,
+        "trace_id": trace_id,
+    }
+
 
 def handle_ui_event(event_dict: dict) -> dict:
     """Simulate server-side intent handling: validate → policy → rate limit → execute → result."""
@@ -42,31 +118,21 @@ def handle_ui_event(event_dict: dict) -> dict:
     event = UiEvent.model_validate(event_dict)
 
     # 3) Policy check (allow-list)
-    policy = IntentPolicy(allowed={"fetch_status"})
-    if not policy.is_allowed(event.intent):
-        result = ActionResult(
-            status="error",
-            intent=event.intent,
-            message="Intent not allowed",
-            details={"allowed": list(policy.allowed)},
+    if not _is_allowed(event.intent):
+        envelope = _result_envelope(
+            "error",
+            event.intent,
+            "Intent not allowed",
+            event.trace_id,
+            details={"allowed": list(_POLICY.allowed)},
         )
-        envelope = result.model_dump(mode="json")
-        envelope["type"] = "action.result"
-        envelope["trace_id"] = event.trace_id
         validate_outbound_if_dev(envelope)
         return envelope
 
     # 4) Rate limiting (per session+intent). Using a static session id here for demo.
     session_id = "dev-session"
     if not RATE_LIMITER.allow(session_id, event.intent):
-        result = ActionResult(
-            status="error",
-            intent=event.intent,
-            message="Rate limit exceeded",
-        )
-        envelope = result.model_dump(mode="json")
-        envelope["type"] = "action.result"
-        envelope["trace_id"] = event.trace_id
+        envelope = _result_envelope("error", event.intent, "Rate limit exceeded", event.trace_id)
         validate_outbound_if_dev(envelope)
         return envelope
 
@@ -79,21 +145,10 @@ def handle_ui_event(event_dict: dict) -> dict:
     )
 
     # 6) Build normalized result envelope
-    result = IntentResult(
-        status=status, message="Fetched URL", details=http_details, trace_id=event.trace_id or ""
+    envelope = _result_envelope(
+        status, event.intent, "Fetched URL", event.trace_id or "", details=http_details
     )
 
-    action_result = ActionResult(
-        status=result.status,
-        intent=event.intent,
-        message=result.message,
-        details=result.details,
-        trace_id=result.trace_id,
-    )
-
-    envelope = action_result.model_dump(mode="json")
-    envelope["type"] = "action.result"
-
     # 7) Validate outbound in dev mode
     validate_outbound_if_dev(envelope)
 
@@ -109,9 +164,10 @@ def main() -> None:
         "trace_id": "uuid-demo-1234",
     }
 
-    # Execute and print the action.result envelope
+    # Execute and print the action.result envelope: indented for a person at a
+    # terminal, one compact line when piped to another program
     result = handle_ui_event(event)
-    print(json.dumps(result, indent=2))
+    print(_dumps(result, pretty=sys.stdout.isatty()))
 
 
 if __name__ == "__main__":
@@ -1,16 +1,17 @@
-import json
+import os
 import sys
-from pathlib import Path
+from functools import lru_cache
 
 # Allow running from repo without installing the package
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from pixell.ui import UISpec, Manifest, View, Component
+from pixell.ui import UISpec, Manifest, View, Component, OpenUrlAction
 
 
+@lru_cache(maxsize=1)
 def build_spec() -> UISpec:
-    return UISpec(
-        manifest=Manifest(
+    return UISpec.model_construct(
+        manifest=Manifest.model_construct(
             id="example.app.v1",
             name="Example App",
             version="1.0.0",
@@ -18,20 +19,20 @@ def build_spec() -> UISpec:
         ),
         data={"items": [{"title": "Hello"}]},
         actions={
-            "open": {"kind": "open_url", "url": "https://example.com"},
+            "open": OpenUrlAction.model_construct(url="https://example.com"),
         },
-        view=View(
+        view=View.model_construct(
             type="page",
             title="Items",
             children=[
-                Component(
+                Component.model_construct(
                     type="list",
                     props={
                         "data": "@items",
                         "item": {"type": "text", "props": {"text": "{{ title }}"}},
                     },
                 ),
-                Component(
+                Component.model_construct(
                     type="button",
                     props={"text": "Open", "onPress": {"action": "open"}},
                 ),
@@ -40,6 +41,11 @@ def build_spec() -> UISpec:
     )
 
 
+@lru_cache(maxsize=1)
+def spec_json() -> str:
+    """Serialize the spec once with Pydantic's native JSON encoder."""
+    return build_spec().model_dump_json(indent=2)
+
+
 if __name__ == "__main__":
-    spec = build_spec()
-    print(json.dumps(spec.model_dump(mode="json"), indent=2))
+    print(spec_json())
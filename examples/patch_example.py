@@ -1,11 +1,22 @@
 import json
+import os
 import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from pixell.ui import make_patch, validate_patch_scope
 
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, indent=2)
+
 
 def main() -> None:
     ops = [
@@ -14,7 +25,7 @@ def main() -> None:
     ]
     validate_patch_scope(ops)
     patch = make_patch(ops)
-    print(json.dumps({"type": "ui.patch", "patch": patch}, indent=2))
+    print(_dumps({"type": "ui.patch", "patch": patch}))
 
 
 if __name__ == "__main__":
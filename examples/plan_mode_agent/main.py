@@ -67,8 +67,10 @@ server = AgentServer(
 )
 
 # In-memory state for managing async responses
-# (Agent manages their own async waiting pattern)
-response_waiters: dict[str, asyncio.Future] = {}
+# (Agent manages their own async waiting pattern). Nothing awaits a response
+# in-process: the respond handler resumes the flow, so only the ids of
+# outstanding requests are tracked, and each is dropped once answered.
+pending_responses: set[str] = set()
 
 
 # =============================================================================
@@ -120,9 +122,8 @@ async def handle_message(ctx: MessageContext):
         ]
     )
 
-    # Create waiter for clarification response
-    waiter = asyncio.Future()
-    response_waiters[clarification_id] = waiter
+    # Track the outstanding clarification request
+    pending_responses.add(clarification_id)
 
     # Wait for user response (agent manages async)
     # In real implementation, this would be handled by the respond handler
@@ -144,6 +145,7 @@ async def handle_respond(ctx: ResponseContext):
 
     if ctx.response_type == "clarification":
         # User answered clarification questions
+        pending_responses.discard(ctx.clarification_id)
         plan.set_clarification_response(ctx.answers, ctx.clarification_id)
 
         topic = ctx.answers.get("topic", "general")
@@ -189,11 +191,12 @@ async def handle_respond(ctx: ResponseContext):
             message="Select the subreddits you want to monitor",
         )
 
-        response_waiters[selection_id] = asyncio.Future()
+        pending_responses.add(selection_id)
         print(f"Waiting for selection response: {selection_id}")
 
     elif ctx.response_type == "selection":
         # User selected items
+        pending_responses.discard(ctx.selection_id)
         plan.set_selection_response(ctx.selected_ids, ctx.selection_id)
 
         selected_items = plan.get_selected_items()
@@ -216,11 +219,12 @@ async def handle_respond(ctx: ResponseContext):
 
         await plan.emit_preview(preview)
 
-        response_waiters[preview.plan_id] = asyncio.Future()
+        pending_responses.add(preview.plan_id)
         print(f"Waiting for plan approval: {preview.plan_id}")
 
     elif ctx.response_type == "plan":
         # User approved/rejected plan
+        pending_responses.discard(ctx.plan_id)
         plan.set_plan_approval(ctx.approved, ctx.plan_id)
 
         if ctx.approved:
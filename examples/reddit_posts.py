@@ -1,14 +1,16 @@
-import json
+import os
 import sys
-from pathlib import Path
+from functools import lru_cache
 
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from pixell.ui import UISpec, Manifest, View, Component
+from pixell.ui import UISpec, Manifest, View, Component, OpenUrlAction, HttpAction, StateSetAction
+from pixell.ui.actions import StateSetOperation
 
 
+@lru_cache(maxsize=1)
 def build_spec() -> UISpec:
-    manifest = Manifest(
+    manifest = Manifest.model_construct(
         id="reddit.commenter.v1",
         name="Reddit Commenter",
         version="1.0.0",
@@ -31,35 +33,37 @@ def build_spec() -> UISpec:
     }
 
     actions = {
-        "openPost": {
-            "kind": "open_url",
-            "url": "https://www.reddit.com/comments/{{ row.id | strip_prefix:'t3_' }}/",
-        },
-        "genComment": {
-            "kind": "http",
-            "method": "POST",
-            "url": "http://localhost:18000/api/v1/reddit-commenter/gen-comment",
-            "body": {"post_id": "{{ row.id }}"},
-        },
-        "approve": {
-            "kind": "http",
-            "method": "POST",
-            "url": "http://localhost:8000/api/chat/stream",
-            "stream": True,
-            "body": {"items": "{{ map @ui.selected to @posts }}"},
-        },
-        "editComment": {
-            "kind": "state.set",
-            "operations": [{"path": "posts[{{ rowIndex }}].comment", "value": "{{ event.value }}"}],
-        },
+        "openPost": OpenUrlAction.model_construct(
+            url="https://www.reddit.com/comments/{{ row.id | strip_prefix:'t3_' }}/",
+        ),
+        "genComment": HttpAction.model_construct(
+            method="POST",
+            url="http://localhost:18000/api/v1/reddit-commenter/gen-comment",
+            body={"post_id": "{{ row.id }}"},
+        ),
+        "approve": HttpAction.model_construct(
+            method="POST",
+            url="http://localhost:8000/api/chat/stream",
+            stream=True,
+            body={"items": "{{ map @ui.selected to @posts }}"},
+        ),
+        "editComment": StateSetAction.model_construct(
+            operations=[
+                StateSetOperation.model_construct(
+                    path="posts[{{ rowIndex }}].comment", value="{{ event.value }}"
+                )
+            ],
+        ),
     }
 
-    view = View(
+    view = View.model_construct(
         type="page",
         title="Reddit Posts",
         children=[
-            Component(type="switch", props={"label": "번역 보기", "bind": "@ui.showTranslations"}),
-            Component(
+            Component.model_construct(
+                type="switch", props={"label": "번역 보기", "bind": "@ui.showTranslations"}
+            ),
+            Component.model_construct(
                 type="table",
                 props={
                     "data": "@posts",
@@ -110,7 +114,7 @@ def build_spec() -> UISpec:
                     ],
                 },
             ),
-            Component(
+            Component.model_construct(
                 type="button",
                 props={
                     "text": "댓글 승인",
@@ -121,9 +125,14 @@ def build_spec() -> UISpec:
         ],
     )
 
-    return UISpec(manifest=manifest, data=data, actions=actions, view=view)
+    return UISpec.model_construct(manifest=manifest, data=data, actions=actions, view=view)
+
+
+@lru_cache(maxsize=1)
+def spec_json() -> str:
+    """Serialize the spec once with Pydantic's native JSON encoder."""
+    return build_spec().model_dump_json(indent=2)
 
 
 if __name__ == "__main__":
-    spec = build_spec()
-    print(json.dumps(spec.model_dump(mode="json"), indent=2))
+    print(spec_json())
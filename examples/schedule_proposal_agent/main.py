@@ -24,7 +24,8 @@ Test with:
       }'
 """
 
-from datetime import datetime, timedelta
+import re
+from datetime import date, datetime, timedelta
 from pixell.sdk import AgentServer, MessageContext
 
 
@@ -37,49 +38,55 @@ server = AgentServer(
     },
 )
 
+# Scheduling intent keywords, matched in a single case-insensitive pass
+SCHEDULING_KEYWORDS = re.compile(
+    "schedule|every|daily|weekly|recurring|automated|remind", re.IGNORECASE
+)
+
 
 def generate_next_runs_preview(count: int = 5) -> list[str]:
     """Generate preview of next run times (weekdays at 9 AM)."""
-    runs = []
-    current = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
-    if current <= datetime.now():
-        current += timedelta(days=1)
-
-    while len(runs) < count:
-        # Skip weekends
-        if current.weekday() < 5:  # Monday=0, Friday=4
-            runs.append(current.isoformat())
-        current += timedelta(days=1)
-
-    return runs
+    now = datetime.now()
+    start = now.replace(hour=9, minute=0, second=0, microsecond=0)
+    if start <= now:
+        start += timedelta(days=1)
+
+    # Skip a weekend start, then step through weekdays arithmetically:
+    # the k-th weekday after a Monday is (k // 5) weeks and (k % 5) days away
+    weekday = start.weekday()  # Monday=0, Friday=4
+    if weekday >= 5:
+        start += timedelta(days=7 - weekday)
+        weekday = 0
+
+    # Work on day ordinals and only format dates; every run shares the 09:00 time
+    first = start.toordinal() - weekday
+    time_suffix = start.isoformat()[10:]
+    return [
+        date.fromordinal(first + (k // 5) * 7 + k % 5).isoformat() + time_suffix
+        for k in range(weekday, weekday + count)
+    ]
 
 
 @server.on_message
 async def handle_message(ctx: MessageContext):
     """Handle incoming messages."""
-    # Extract text from message parts
-    message_text = ""
+    # Extract text from message parts, parsed objects or raw dicts, in one join
+    texts = []
     if ctx.message and ctx.message.parts:
         for part in ctx.message.parts:
-            if hasattr(part, "text"):
-                message_text += part.text
-            elif isinstance(part, dict) and part.get("type") == "text":
-                message_text += part.get("text", "")
+            if isinstance(part, dict):
+                if part.get("type") == "text":
+                    texts.append(part.get("text", ""))
+            else:
+                text = getattr(part, "text", None)
+                if text is not None:
+                    texts.append(text)
+    message_text = "".join(texts)
 
-    message_lower = message_text.lower()
     plan = ctx.plan_mode
 
     # Detect scheduling intent
-    scheduling_keywords = [
-        "schedule",
-        "every",
-        "daily",
-        "weekly",
-        "recurring",
-        "automated",
-        "remind",
-    ]
-    has_scheduling_intent = any(kw in message_lower for kw in scheduling_keywords)
+    has_scheduling_intent = SCHEDULING_KEYWORDS.search(message_text) is not None
 
     if has_scheduling_intent:
         await ctx.emit_status("working", "Analyzing your scheduling request...")
@@ -0,0 +1,64 @@
+"""Constants and helpers shared by the SDK example tests."""
+
+import os
+
+from pixell.sdk import (
+    APIError,
+    AuthenticationError,
+    ClientError,
+    ConnectionError,
+    ConsumerError,
+    ContextError,
+    ContextNotInitializedError,
+    ProgressError,
+    QueueError,
+    RateLimitError,
+    SDKError,
+    TaskHandlerError,
+    TaskTimeoutError,
+)
+
+# Per-test "✓ ..." lines are only printed when SDK_TEST_VERBOSE is set
+VERBOSE = bool(os.environ.get("SDK_TEST_VERBOSE"))
+
+# Public methods every UserContext is expected to expose
+EXPECTED_USERCONTEXT_METHODS = frozenset(
+    {
+        "from_task",
+        "get_user_profile",
+        "get_files",
+        "get_file_content",
+        "get_conversations",
+        "get_task_history",
+        "call_oauth_api",
+        "report_progress",
+        "report_error",
+        "close",
+    }
+)
+
+# (child, parent) for every link of the SDK error hierarchy
+ERROR_HIERARCHY = (
+    # Consumer errors
+    (ConsumerError, SDKError),
+    (TaskTimeoutError, ConsumerError),
+    (TaskHandlerError, ConsumerError),
+    (QueueError, ConsumerError),
+    # Client errors
+    (ClientError, SDKError),
+    (AuthenticationError, ClientError),
+    (RateLimitError, ClientError),
+    (APIError, ClientError),
+    (ConnectionError, ClientError),
+    # Context errors
+    (ContextError, SDKError),
+    (ContextNotInitializedError, ContextError),
+    # Progress errors
+    (ProgressError, SDKError),
+)
+
+
+def ok(message: str) -> None:
+    """Print a per-test success line if SDK_TEST_VERBOSE is set."""
+    if VERBOSE:
+        print(message)
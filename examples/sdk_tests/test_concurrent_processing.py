@@ -1,27 +1,68 @@
-#!/usr/bin/env python3
 """Test concurrent task processing patterns.
 
 These tests verify that the SDK handles concurrent operations correctly,
-including semaphore-based concurrency limits and parallel task execution.
+including admission-controlled concurrency limits and parallel task execution.
+
+Run with: pytest examples/sdk_tests/test_concurrent_processing.py
 """
 
 import asyncio
-from datetime import datetime
-from typing import List, Dict, Any
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Deque, List, Dict, Any, Tuple
+
+import pytest
 
 from pixell.sdk import (
     TaskConsumer,
 )
 
+# All tests share one event loop for the module instead of one loop per test
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+# (status, percent) for each progress update a simulated task reports
+_PROGRESS_STEPS = (
+    ("starting", 0),
+    ("processing", 25),
+    ("processing", 50),
+    ("processing", 75),
+    ("completed", 100),
+)
+
+
+# Handlers are never invoked by these tests; one shared result serves every consumer
+_SUCCESS = {"status": "success"}
+
+
+async def _handle_success(ctx, payload):
+    return _SUCCESS
+
+
+@dataclass(slots=True)
+class ProgressUpdate:
+    """One recorded progress update."""
+
+    task_id: str
+    status: str
+    percent: int
+    timestamp_ns: int
+
 
 class TestConcurrentProcessing:
     """Test concurrent task processing scenarios."""
 
     async def test_semaphore_limits_concurrency(self):
-        """Test that concurrent tasks respect semaphore limits."""
+        """Test that concurrent tasks respect an admission limit.
+
+        The limit is a counter guarded by a Condition rather than a Semaphore:
+        a release wakes exactly one waiter, and the limit is a plain integer
+        that could be resized while tasks wait.
+        """
         max_concurrent = 3
         total_tasks = 10
-        semaphore = asyncio.Semaphore(max_concurrent)
+        cond = asyncio.Condition()
+        limit = max_concurrent
 
         active_count = 0
         max_active_observed = 0
@@ -30,68 +71,62 @@ class TestConcurrentProcessing:
         async def process_task(task_id: int):
             nonlocal active_count, max_active_observed
 
-            async with semaphore:
+            async with cond:
+                await cond.wait_for(lambda: active_count < limit)
                 active_count += 1
-                max_active_observed = max(max_active_observed, active_count)
+                if active_count > max_active_observed:
+                    max_active_observed = active_count
 
-                # Simulate work
-                await asyncio.sleep(0.02)
+            # Simulate work
+            await asyncio.sleep(0.02)
 
-                completed_tasks.append(task_id)
+            completed_tasks.append(task_id)
+            async with cond:
                 active_count -= 1
+                cond.notify(1)
 
-        # Create all tasks at once
-        tasks = [asyncio.create_task(process_task(i)) for i in range(total_tasks)]
-
-        # Wait for all to complete
-        await asyncio.gather(*tasks)
+        # Create all tasks at once; the group waits for all to complete
+        async with asyncio.TaskGroup() as tg:
+            for i in range(total_tasks):
+                tg.create_task(process_task(i))
 
         # Verify concurrency was limited
         assert max_active_observed <= max_concurrent
         assert len(completed_tasks) == total_tasks
 
-        print(f"✓ Semaphore limited concurrency to {max_active_observed} (max: {max_concurrent})")
+        print(f"✓ Admission limited concurrency to {max_active_observed} (max: {max_concurrent})")
 
     async def test_task_consumer_concurrency_property(self):
         """Test TaskConsumer concurrency configuration."""
-
-        async def dummy_handler(ctx, payload):
-            return {"status": "success"}
-
-        # Test different concurrency settings
-        for concurrency in [1, 5, 10, 20]:
-            consumer = TaskConsumer(
-                agent_id="test-agent",
-                redis_url="redis://localhost:6379",
-                pxui_base_url="https://api.example.com",
-                handler=dummy_handler,
-                concurrency=concurrency,
-            )
+        # Test different concurrency settings; only the concurrency argument varies.
+        # Construction is what is under test and is cheap: the Redis client is
+        # only created on first use.
+        consumer_kwargs = {
+            "agent_id": "test-agent",
+            "redis_url": "redis://localhost:6379",
+            "pxui_base_url": "https://api.example.com",
+            "handler": _handle_success,
+        }
+        for concurrency in (1, 5, 10, 20):
+            consumer = TaskConsumer(**consumer_kwargs, concurrency=concurrency)
             assert consumer.concurrency == concurrency
 
         print("✓ TaskConsumer accepts different concurrency settings")
 
     async def test_parallel_consumers_different_agents(self):
         """Test multiple consumers for different agents."""
-
-        async def handler_a(ctx, payload):
-            return {"agent": "a", "result": "success"}
-
-        async def handler_b(ctx, payload):
-            return {"agent": "b", "result": "success"}
-
         consumer_a = TaskConsumer(
             agent_id="agent-a",
             redis_url="redis://localhost:6379",
             pxui_base_url="https://api.example.com",
-            handler=handler_a,
+            handler=_handle_success,
         )
 
         consumer_b = TaskConsumer(
             agent_id="agent-b",
             redis_url="redis://localhost:6379",
             pxui_base_url="https://api.example.com",
-            handler=handler_b,
+            handler=_handle_success,
         )
 
         # Verify separate queues
@@ -106,41 +141,35 @@ class TestConcurrentProcessing:
 
     async def test_concurrent_progress_updates(self):
         """Test that concurrent progress updates don't interfere."""
-        update_log: List[Dict[str, Any]] = []
-        lock = asyncio.Lock()
+        update_log: Deque[ProgressUpdate] = deque()
 
         async def mock_update(task_id: str, status: str, percent: int):
-            async with lock:
-                update_log.append(
-                    {
-                        "task_id": task_id,
-                        "status": status,
-                        "percent": percent,
-                        "timestamp": datetime.utcnow().isoformat(),
-                    }
-                )
-            await asyncio.sleep(0.001)  # Simulate network delay
+            # Nothing is awaited between building the entry and appending it, so
+            # concurrent updates cannot interleave and no lock is needed
+            update_log.append(ProgressUpdate(task_id, status, percent, time.time_ns()))
+            await asyncio.sleep(0)  # Yield, as a network call would
 
         async def simulate_task_progress(task_id: str):
-            for percent in [0, 25, 50, 75, 100]:
-                status = (
-                    "starting" if percent == 0 else "completed" if percent == 100 else "processing"
-                )
+            for status, percent in _PROGRESS_STEPS:
                 await mock_update(task_id, status, percent)
 
         # Run 5 tasks concurrently
-        tasks = [asyncio.create_task(simulate_task_progress(f"task-{i}")) for i in range(5)]
-        await asyncio.gather(*tasks)
+        task_ids = [f"task-{i}" for i in range(5)]
+        async with asyncio.TaskGroup() as tg:
+            for task_id in task_ids:
+                tg.create_task(simulate_task_progress(task_id))
 
         # Verify all updates recorded
         assert len(update_log) == 25  # 5 tasks * 5 updates each
 
-        # Verify each task has all its updates
-        for i in range(5):
-            task_updates = [u for u in update_log if u["task_id"] == f"task-{i}"]
-            assert len(task_updates) == 5
-            percents = sorted([u["percent"] for u in task_updates])
-            assert percents == [0, 25, 50, 75, 100]
+        # Verify each task has all its updates, bucketing the log in one pass
+        percents_by_task: Dict[str, List[int]] = defaultdict(list)
+        for update in update_log:
+            percents_by_task[update.task_id].append(update.percent)
+        for task_id in task_ids:
+            percents = percents_by_task[task_id]
+            assert len(percents) == 5
+            assert sorted(percents) == [0, 25, 50, 75, 100]
 
         print("✓ Concurrent progress updates recorded correctly")
 
@@ -155,18 +184,20 @@ class TestConcurrentProcessing:
             for i in range(3):
                 local_state["value"] += 1
                 local_state["steps"].append(f"step-{i}")
-                await asyncio.sleep(0.001)
+                await asyncio.sleep(0)
 
             task_states[task_id] = local_state
             return local_state
 
         # Run tasks with different initial values concurrently
-        tasks = [asyncio.create_task(isolated_handler(f"task-{i}", i * 10)) for i in range(5)]
-        await asyncio.gather(*tasks)
+        task_ids = [f"task-{i}" for i in range(5)]
+        async with asyncio.TaskGroup() as tg:
+            for i, task_id in enumerate(task_ids):
+                tg.create_task(isolated_handler(task_id, i * 10))
 
         # Verify each task has correct final state
-        for i in range(5):
-            state = task_states[f"task-{i}"]
+        for i, task_id in enumerate(task_ids):
+            state = task_states[task_id]
             expected_value = i * 10 + 3  # initial + 3 increments
             assert state["value"] == expected_value
             assert len(state["steps"]) == 3
@@ -176,14 +207,14 @@ class TestConcurrentProcessing:
     async def test_graceful_shutdown_waits_for_tasks(self):
         """Test graceful shutdown waits for in-flight tasks."""
         completed_tasks = []
-        asyncio.Event()
 
         async def long_running_task(task_id: str):
             await asyncio.sleep(0.05)
             completed_tasks.append(task_id)
             return task_id
 
-        # Start tasks
+        # Start tasks. Like TaskConsumer, hold strong references until each task
+        # is done: the event loop itself only keeps weak ones.
         tasks = set()
         for i in range(5):
             task = asyncio.create_task(long_running_task(f"task-{i}"))
@@ -191,7 +222,7 @@ class TestConcurrentProcessing:
             task.add_done_callback(tasks.discard)
 
         # Simulate graceful shutdown (wait for completion)
-        await asyncio.gather(*list(tasks), return_exceptions=True)
+        await asyncio.wait(tasks)
 
         # All tasks should complete
         assert len(completed_tasks) == 5
@@ -211,18 +242,22 @@ class TestConcurrentProcessing:
                 cancelled_tasks.append(task_id)
                 raise
 
-        # Start tasks
-        tasks = [asyncio.create_task(cancellable_task(f"task-{i}")) for i in range(5)]
+        # Start tasks under one gather, so a single cancel reaches all of them
+        group = asyncio.gather(
+            *(cancellable_task(f"task-{i}") for i in range(5)), return_exceptions=True
+        )
 
         # Give tasks a moment to start
         await asyncio.sleep(0.01)
 
         # Cancel all tasks (ungraceful shutdown)
-        for task in tasks:
-            task.cancel()
+        group.cancel()
 
         # Wait for cancellation to propagate
-        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            await group
+        except asyncio.CancelledError:
+            pass
 
         # Tasks should be cancelled, not completed
         assert len(completed_tasks) == 0
@@ -241,21 +276,27 @@ class TestConcurrentProcessing:
             results[task_id] = "success"
             return "success"
 
-        # Create mix of failing and succeeding tasks
-        tasks = [
-            asyncio.create_task(task_that_might_fail("task-0", should_fail=True)),
-            asyncio.create_task(task_that_might_fail("task-1", should_fail=False)),
-            asyncio.create_task(task_that_might_fail("task-2", should_fail=True)),
-            asyncio.create_task(task_that_might_fail("task-3", should_fail=False)),
-            asyncio.create_task(task_that_might_fail("task-4", should_fail=False)),
-        ]
+        outcomes: List[Any] = []
+
+        async def record_outcome(task_id: str, should_fail: bool):
+            # Catch the failure inside the task so the group does not cancel siblings
+            try:
+                outcomes.append(await task_that_might_fail(task_id, should_fail))
+            except ValueError as e:
+                outcomes.append(e)
 
-        # Gather with return_exceptions=True to not propagate errors
-        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        # Create mix of failing and succeeding tasks
+        async with asyncio.TaskGroup() as tg:
+            for i, should_fail in enumerate([True, False, True, False, False]):
+                tg.create_task(record_outcome(f"task-{i}", should_fail))
 
         # Verify mix of results
-        success_count = sum(1 for o in outcomes if o == "success")
-        error_count = sum(1 for o in outcomes if isinstance(o, ValueError))
+        success_count = error_count = 0
+        for outcome in outcomes:
+            if isinstance(outcome, ValueError):
+                error_count += 1
+            elif outcome == "success":
+                success_count += 1
 
         assert success_count == 3
         assert error_count == 2
@@ -267,55 +308,45 @@ class TestConcurrentProcessing:
         """Test concurrent access to different Redis keys."""
         # Simulate Redis key operations
         redis_state: Dict[str, Any] = {}
-        operation_log: List[str] = []
-        lock = asyncio.Lock()
+        operation_log: Deque[str] = deque()
 
-        async def redis_operation(key: str, operation: str, value: Any = None):
-            async with lock:
+        async def redis_pipeline(commands: List[Tuple[str, str, Any]]) -> List[Any]:
+            # Like a Redis pipeline: every command is applied before the single
+            # round trip, and nothing is awaited in between, so no lock is needed
+            results: List[Any] = []
+            for operation, key, value in commands:
                 operation_log.append(f"{operation}:{key}")
                 if operation == "set":
                     redis_state[key] = value
+                    results.append(None)
                 elif operation == "get":
-                    return redis_state.get(key)
+                    results.append(redis_state.get(key))
                 elif operation == "delete":
-                    redis_state.pop(key, None)
-            await asyncio.sleep(0.001)
+                    results.append(redis_state.pop(key, None))
+            await asyncio.sleep(0)
+            return results
 
         async def process_task(task_id: str):
             # Simulate task lifecycle with Redis operations
-            await redis_operation(f"task:{task_id}:status", "set", "processing")
-            await asyncio.sleep(0.01)
-            await redis_operation(f"task:{task_id}:result", "set", {"success": True})
-            await redis_operation(f"task:{task_id}:status", "set", "completed")
+            status_key = f"task:{task_id}:status"
+            await redis_pipeline([("set", status_key, "processing")])
+            await asyncio.sleep(0)
+            await redis_pipeline(
+                [
+                    ("set", f"task:{task_id}:result", {"success": True}),
+                    ("set", status_key, "completed"),
+                ]
+            )
 
         # Run multiple tasks concurrently
-        tasks = [asyncio.create_task(process_task(f"task-{i}")) for i in range(10)]
-        await asyncio.gather(*tasks)
+        task_ids = [f"task-{i}" for i in range(10)]
+        async with asyncio.TaskGroup() as tg:
+            for task_id in task_ids:
+                tg.create_task(process_task(task_id))
 
         # Verify all tasks completed
-        for i in range(10):
-            assert redis_state.get(f"task:task-{i}:status") == "completed"
-            assert redis_state.get(f"task:task-{i}:result") == {"success": True}
+        for task_id in task_ids:
+            assert redis_state.get(f"task:{task_id}:status") == "completed"
+            assert redis_state.get(f"task:{task_id}:result") == {"success": True}
 
         print("✓ Concurrent Redis key operations completed correctly")
-
-
-async def run_all_tests():
-    """Run all concurrent processing tests."""
-    test_instance = TestConcurrentProcessing()
-
-    await test_instance.test_semaphore_limits_concurrency()
-    await test_instance.test_task_consumer_concurrency_property()
-    await test_instance.test_parallel_consumers_different_agents()
-    await test_instance.test_concurrent_progress_updates()
-    await test_instance.test_task_isolation()
-    await test_instance.test_graceful_shutdown_waits_for_tasks()
-    await test_instance.test_ungraceful_shutdown_cancels_tasks()
-    await test_instance.test_exception_in_one_task_doesnt_affect_others()
-    await test_instance.test_concurrent_redis_key_access_patterns()
-
-    print("\n✓ All concurrent processing tests passed!")
-
-
-if __name__ == "__main__":
-    asyncio.run(run_all_tests())
@@ -7,7 +7,7 @@ UserContext and its underlying resources.
 
 import asyncio
 from datetime import datetime
-from typing import Dict, Any
+from typing import Any, Dict, List
 
 from pixell.sdk import (
     UserContext,
@@ -15,43 +15,187 @@ from pixell.sdk import (
     ContextNotInitializedError,
 )
 
+from _constants import EXPECTED_USERCONTEXT_METHODS, ok
+
+# Built once at import: the tests below only read these, never mutate them
+_NOW = datetime.utcnow()
+_BASE_META = TaskMetadata(
+    task_id="task-123",
+    agent_id="test-agent",
+    user_id="user-456",
+    tenant_id="tenant-789",
+    trace_id="trace-abc",
+    created_at=_NOW,
+    payload={"prompt": "test", "options": {"key": "value"}},
+)
+_EMPTY_PAYLOAD_META = TaskMetadata(
+    task_id="task-empty",
+    agent_id="test-agent",
+    user_id="user-123",
+    tenant_id="tenant-456",
+    trace_id="trace-789",
+    created_at=_NOW,
+    payload={},
+)
+
+_X100 = "x" * 100
+_LARGE_PAYLOAD = {
+    "items": [{"id": i, "data": _X100} for i in range(1000)],
+    "nested": {"level1": {"level2": {"level3": {"values": list(range(100))}}}},
+}
+_LARGE_PAYLOAD_META = TaskMetadata(
+    task_id="task-large",
+    agent_id="test-agent",
+    user_id="user-123",
+    tenant_id="tenant-456",
+    trace_id="trace-789",
+    created_at=_NOW,
+    payload=_LARGE_PAYLOAD,
+)
+
+
+class _LifecycleMock:
+    """Stand-in for UserContext that records its lifecycle.
+
+    Usable as an async context manager; exiting closes it. close() is
+    idempotent, closes every resource even if one fails, and any operation
+    after close raises ContextNotInitializedError.
+    """
+
+    def __init__(self, resources=()):
+        self.entered = False
+        self.exited = False
+        self.close_count = 0
+        self.operations: list[str] = []
+        self._resources = list(resources)
+        self._closed = False
+
+    async def __aenter__(self):
+        self.entered = True
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.exited = True
+        await self.close()
+        return False  # Don't suppress exceptions
+
+    async def close(self):
+        # Only the first call counts: True adds 1, later calls add False (0)
+        self.close_count += not self._closed
+        if self._closed:
+            return
+        self._closed = True
+
+        # Close every resource at once; return_exceptions keeps one failure
+        # from cancelling the rest
+        await asyncio.gather(
+            *(resource.close() for resource in self._resources), return_exceptions=True
+        )
+
+    def _check_closed(self):
+        if self._closed:
+            raise ContextNotInitializedError("Context is closed")
+
+    async def do_work(self):
+        self._check_closed()
+        return "success"
+
+    async def do_work_that_fails(self):
+        raise ValueError("Intentional error")
+
+    async def get_data(self):
+        self._check_closed()
+        return {"data": "value"}
+
+    async def get_profile(self):
+        self._check_closed()
+        self.operations.append("get_profile")
+        return {}
+
+    async def get_files(self):
+        self._check_closed()
+        self.operations.append("get_files")
+        return []
+
+    async def report_progress(self, status, percent):
+        self._check_closed()
+        self.operations.append("report_progress")
+
+
+class _ResourceMock:
+    """Resource that logs its name when closed, optionally failing afterwards."""
+
+    def __init__(self, name: str, log: List[str], fail: bool = False):
+        self.name = name
+        self.log = log
+        self.fail = fail
+
+    async def close(self):
+        self.log.append(self.name)
+        if self.fail:
+            raise ValueError("Cleanup failed")
+
+
+class _HttpClientMock:
+    def __init__(self):
+        self.request_count = 0
+
+    async def request(self, *args, **kwargs):
+        self.request_count += 1
+        return {"status": "ok"}
+
+
+class _ClientReuseMock:
+    """Context that creates its HTTP client lazily, once."""
+
+    def __init__(self):
+        self.client_creation_count = 0
+        self._client = None
+
+    async def _get_client(self):
+        if self._client is None:
+            self._client = _HttpClientMock()
+            self.client_creation_count += 1
+        return self._client
+
+    async def make_request(self):
+        client = await self._get_client()
+        return await client.request()
+
+
+class _StateMock:
+    """Context whose state snapshots land in a shared sink, keyed by context id."""
+
+    def __init__(self, context_id: str, sink: Dict[str, Dict]):
+        self.context_id = context_id
+        self.state: Dict[str, Any] = {}
+        self._sink = sink
+
+    def set_state(self, key: str, value: Any):
+        self.state[key] = value
+        self._sink[self.context_id] = self.state.copy()
+
 
 class TestContextInitialization:
     """Test UserContext initialization patterns."""
 
     def test_task_metadata_creation(self):
         """Test TaskMetadata with all fields."""
-        now = datetime.utcnow()
-        metadata = TaskMetadata(
-            task_id="task-123",
-            agent_id="test-agent",
-            user_id="user-456",
-            tenant_id="tenant-789",
-            trace_id="trace-abc",
-            created_at=now,
-            payload={"prompt": "test", "options": {"key": "value"}},
-        )
+        metadata = _BASE_META
 
         assert metadata.task_id == "task-123"
         assert metadata.agent_id == "test-agent"
         assert metadata.user_id == "user-456"
         assert metadata.tenant_id == "tenant-789"
         assert metadata.trace_id == "trace-abc"
-        assert metadata.created_at == now
+        assert metadata.created_at == _NOW
         assert metadata.payload == {"prompt": "test", "options": {"key": "value"}}
 
-        print("✓ TaskMetadata created with all fields")
+        ok("✓ TaskMetadata created with all fields")
 
     def test_task_metadata_immutability(self):
         """Test that TaskMetadata fields are accessible but dataclass frozen behavior."""
-        metadata = TaskMetadata(
-            task_id="task-123",
-            agent_id="test-agent",
-            user_id="user-456",
-            tenant_id="tenant-789",
-            trace_id="trace-abc",
-            created_at=datetime.utcnow(),
-        )
+        metadata = _BASE_META
 
         # Fields should be accessible
         assert metadata.task_id == "task-123"
@@ -59,34 +203,21 @@ class TestContextInitialization:
         # Note: Pydantic dataclasses may or may not be frozen by default
         # This test verifies field access, not mutation prevention
 
-        print("✓ TaskMetadata fields are accessible")
+        ok("✓ TaskMetadata fields are accessible")
 
     def test_context_factory_method_exists(self):
         """Test UserContext.from_task factory method exists."""
         assert hasattr(UserContext, "from_task")
         assert callable(UserContext.from_task)
 
-        print("✓ UserContext.from_task factory method exists")
+        ok("✓ UserContext.from_task factory method exists")
 
     def test_context_expected_methods(self):
         """Test UserContext has all expected methods."""
-        expected_methods = [
-            "from_task",
-            "get_user_profile",
-            "get_files",
-            "get_file_content",
-            "get_conversations",
-            "get_task_history",
-            "call_oauth_api",
-            "report_progress",
-            "report_error",
-            "close",
-        ]
+        missing = EXPECTED_USERCONTEXT_METHODS.difference(dir(UserContext))
+        assert not missing, f"Missing methods: {sorted(missing)}"
 
-        for method_name in expected_methods:
-            assert hasattr(UserContext, method_name), f"Missing method: {method_name}"
-
-        print("✓ UserContext has all expected methods")
+        ok("✓ UserContext has all expected methods")
 
 
 class TestContextLifecycle:
@@ -94,134 +225,57 @@ class TestContextLifecycle:
 
     async def test_context_as_async_context_manager(self):
         """Test UserContext as async context manager."""
-        entered = False
-        exited = False
-
-        class MockContext:
-            async def __aenter__(self):
-                nonlocal entered
-                entered = True
-                return self
+        mock = _LifecycleMock()
 
-            async def __aexit__(self, exc_type, exc_val, exc_tb):
-                nonlocal exited
-                exited = True
-                return False
+        async with mock:
+            assert mock.entered
+            assert not mock.exited
 
-            async def close(self):
-                pass
-
-        async with MockContext():
-            assert entered
-            assert not exited
-
-        assert exited
+        assert mock.exited
 
-        print("✓ Async context manager pattern works correctly")
+        ok("✓ Async context manager pattern works correctly")
 
     async def test_context_cleanup_on_success(self):
         """Test that context is cleaned up after successful execution."""
-        cleanup_called = False
-
-        class MockContext:
-            def __init__(self):
-                self._closed = False
-
-            async def __aenter__(self):
-                return self
-
-            async def __aexit__(self, exc_type, exc_val, exc_tb):
-                await self.close()
-                return False
-
-            async def close(self):
-                nonlocal cleanup_called
-                cleanup_called = True
-                self._closed = True
-
-            async def do_work(self):
-                return "success"
-
-        async with MockContext() as ctx:
+        async with _LifecycleMock() as ctx:
             result = await ctx.do_work()
             assert result == "success"
 
-        assert cleanup_called
+        assert ctx.close_count == 1
 
-        print("✓ Context cleaned up after successful execution")
+        ok("✓ Context cleaned up after successful execution")
 
     async def test_context_cleanup_on_exception(self):
         """Test that context is cleaned up even when exception occurs."""
-        cleanup_called = False
         exception_raised = False
 
-        class MockContext:
-            async def __aenter__(self):
-                return self
-
-            async def __aexit__(self, exc_type, exc_val, exc_tb):
-                nonlocal cleanup_called
-                cleanup_called = True
-                return False  # Don't suppress exception
-
-            async def do_work_that_fails(self):
-                raise ValueError("Intentional error")
-
         try:
-            async with MockContext() as ctx:
+            async with _LifecycleMock() as ctx:
                 await ctx.do_work_that_fails()
         except ValueError:
             exception_raised = True
 
         assert exception_raised
-        assert cleanup_called
+        assert ctx.exited
 
-        print("✓ Context cleaned up even when exception occurs")
+        ok("✓ Context cleaned up even when exception occurs")
 
     async def test_context_close_idempotency(self):
         """Test that calling close() multiple times is safe."""
-        close_count = 0
-
-        class MockContext:
-            def __init__(self):
-                self._closed = False
-
-            async def close(self):
-                nonlocal close_count
-                if not self._closed:
-                    close_count += 1
-                    self._closed = True
-
-        ctx = MockContext()
+        ctx = _LifecycleMock()
 
         # Close multiple times
         await ctx.close()
         await ctx.close()
         await ctx.close()
 
-        assert close_count == 1
+        assert ctx.close_count == 1
 
-        print("✓ Context close is idempotent")
+        ok("✓ Context close is idempotent")
 
     async def test_closed_context_raises_error(self):
         """Test that using closed context raises error."""
-
-        class MockContext:
-            def __init__(self):
-                self._closed = False
-
-            def _check_closed(self):
-                if self._closed:
-                    raise ContextNotInitializedError("Context is closed")
-
-            async def close(self):
-                self._closed = True
-
-            async def get_data(self):
-                self._check_closed()
-                return {"data": "value"}
-
-        ctx = MockContext()
+        ctx = _LifecycleMock()
 
         # Works before close
         result = await ctx.get_data()
@@ -237,7 +291,7 @@ class TestContextLifecycle:
         except ContextNotInitializedError:
             pass
 
-        print("✓ Closed context raises ContextNotInitializedError")
+        ok("✓ Closed context raises ContextNotInitializedError")
 
 
 class TestResourceManagement:
@@ -245,125 +299,49 @@ class TestResourceManagement:
 
     async def test_nested_resource_cleanup(self):
         """Test cleanup of nested resources (client and reporter)."""
-        client_closed = False
-        reporter_closed = False
-
-        class MockClient:
-            async def close(self):
-                nonlocal client_closed
-                client_closed = True
-
-        class MockReporter:
-            async def close(self):
-                nonlocal reporter_closed
-                reporter_closed = True
-
-        class MockContext:
-            def __init__(self):
-                self._client = MockClient()
-                self._reporter = MockReporter()
-                self._closed = False
-
-            async def __aenter__(self):
-                return self
-
-            async def __aexit__(self, exc_type, exc_val, exc_tb):
-                await self.close()
-                return False
-
-            async def close(self):
-                if self._closed:
-                    return
-                self._closed = True
-
-                # Close both resources
-                await self._client.close()
-                await self._reporter.close()
-
-        async with MockContext():
+        closed: List[str] = []
+
+        async with _LifecycleMock(
+            resources=[_ResourceMock("client", closed), _ResourceMock("reporter", closed)]
+        ):
             pass
 
-        assert client_closed
-        assert reporter_closed
+        assert "client" in closed
+        assert "reporter" in closed
 
-        print("✓ Nested resources cleaned up correctly")
+        ok("✓ Nested resources cleaned up correctly")
 
     async def test_cleanup_continues_after_error(self):
         """Test that cleanup continues even if one resource fails."""
-        cleanup_order = []
-
-        class FailingResource:
-            async def close(self):
-                cleanup_order.append("failing_start")
-                raise ValueError("Cleanup failed")
-
-        class SuccessfulResource:
-            async def close(self):
-                cleanup_order.append("successful")
-
-        class MockContext:
-            def __init__(self):
-                self._resources = [FailingResource(), SuccessfulResource()]
-
-            async def close(self):
-                errors = []
-                for resource in self._resources:
-                    try:
-                        await resource.close()
-                    except Exception as e:
-                        errors.append(e)
-
-                if errors:
-                    # Log but don't re-raise to ensure all resources attempted
-                    pass
-
-        ctx = MockContext()
+        cleanup_order: List[str] = []
+
+        ctx = _LifecycleMock(
+            resources=[
+                _ResourceMock("failing_start", cleanup_order, fail=True),
+                _ResourceMock("successful", cleanup_order),
+            ]
+        )
         await ctx.close()
 
         assert "failing_start" in cleanup_order
         assert "successful" in cleanup_order
 
-        print("✓ Cleanup continues after individual resource failure")
+        ok("✓ Cleanup continues after individual resource failure")
 
     async def test_client_reuse_within_context(self):
         """Test that HTTP client is reused within a context."""
-        client_creation_count = 0
-        request_count = 0
-
-        class MockHttpClient:
-            def __init__(self):
-                nonlocal client_creation_count
-                client_creation_count += 1
-
-            async def request(self, *args, **kwargs):
-                nonlocal request_count
-                request_count += 1
-                return {"status": "ok"}
+        ctx = _ClientReuseMock()
 
-        class MockContext:
-            def __init__(self):
-                self._client = None
+        # Make multiple requests concurrently; _get_client never awaits before
+        # storing the client, so the first request creates it and the rest reuse it
+        results = await asyncio.gather(*(ctx.make_request() for _ in range(3)))
 
-            async def _get_client(self):
-                if self._client is None:
-                    self._client = MockHttpClient()
-                return self._client
+        assert results == [{"status": "ok"}] * 3
 
-            async def make_request(self):
-                client = await self._get_client()
-                return await client.request()
+        assert ctx.client_creation_count == 1  # Single client created
+        assert ctx._client.request_count == 3  # All requests made
 
-        ctx = MockContext()
-
-        # Make multiple requests
-        await ctx.make_request()
-        await ctx.make_request()
-        await ctx.make_request()
-
-        assert client_creation_count == 1  # Single client created
-        assert request_count == 3  # All requests made
-
-        print("✓ HTTP client reused within context")
+        ok("✓ HTTP client reused within context")
 
 
 class TestContextMetadata:
@@ -371,41 +349,22 @@ class TestContextMetadata:
 
     def test_metadata_preserved_throughout_lifecycle(self):
         """Test that metadata is preserved throughout context lifecycle."""
-        trace_id = "trace-unique-123"
-        task_id = "task-456"
-
-        metadata = TaskMetadata(
-            task_id=task_id,
-            agent_id="test-agent",
-            user_id="user-789",
-            tenant_id="tenant-abc",
-            trace_id=trace_id,
-            created_at=datetime.utcnow(),
-        )
+        metadata = _BASE_META
 
         # Verify metadata fields accessible
-        assert metadata.trace_id == trace_id
-        assert metadata.task_id == task_id
+        assert metadata.trace_id == "trace-abc"
+        assert metadata.task_id == "task-123"
 
-        print("✓ Metadata preserved throughout lifecycle")
+        ok("✓ Metadata preserved throughout lifecycle")
 
     def test_multiple_contexts_isolated(self):
         """Test that multiple contexts don't share state."""
         contexts_data: Dict[str, Dict] = {}
 
-        class MockContext:
-            def __init__(self, context_id: str):
-                self.context_id = context_id
-                self.state = {}
-
-            def set_state(self, key: str, value: Any):
-                self.state[key] = value
-                contexts_data[self.context_id] = self.state.copy()
-
         # Create multiple contexts
-        ctx1 = MockContext("ctx-1")
-        ctx2 = MockContext("ctx-2")
-        ctx3 = MockContext("ctx-3")
+        ctx1 = _StateMock("ctx-1", contexts_data)
+        ctx2 = _StateMock("ctx-2", contexts_data)
+        ctx3 = _StateMock("ctx-3", contexts_data)
 
         # Set different state in each
         ctx1.set_state("value", 100)
@@ -417,45 +376,24 @@ class TestContextMetadata:
         assert contexts_data["ctx-2"]["value"] == 200
         assert contexts_data["ctx-3"]["value"] == 300
 
-        print("✓ Multiple contexts are isolated")
+        ok("✓ Multiple contexts are isolated")
 
     async def test_context_with_empty_payload(self):
         """Test context handles empty payload correctly."""
-        metadata = TaskMetadata(
-            task_id="task-empty",
-            agent_id="test-agent",
-            user_id="user-123",
-            tenant_id="tenant-456",
-            trace_id="trace-789",
-            created_at=datetime.utcnow(),
-            payload={},  # Empty payload
-        )
+        metadata = _EMPTY_PAYLOAD_META
 
         assert metadata.payload == {}
 
-        print("✓ Context handles empty payload correctly")
+        ok("✓ Context handles empty payload correctly")
 
     async def test_context_with_large_payload(self):
         """Test context handles large payload correctly."""
-        large_data = {
-            "items": [{"id": i, "data": "x" * 100} for i in range(1000)],
-            "nested": {"level1": {"level2": {"level3": {"values": list(range(100))}}}},
-        }
-
-        metadata = TaskMetadata(
-            task_id="task-large",
-            agent_id="test-agent",
-            user_id="user-123",
-            tenant_id="tenant-456",
-            trace_id="trace-789",
-            created_at=datetime.utcnow(),
-            payload=large_data,
-        )
+        metadata = _LARGE_PAYLOAD_META
 
         assert len(metadata.payload["items"]) == 1000
         assert metadata.payload["nested"]["level1"]["level2"]["level3"]["values"][50] == 50
 
-        print("✓ Context handles large payload correctly")
+        ok("✓ Context handles large payload correctly")
 
 
 class TestContextErrorScenarios:
@@ -472,62 +410,35 @@ class TestContextErrorScenarios:
         error2 = ContextNotInitializedError("Custom: context was closed")
         assert str(error2) == "Custom: context was closed"
 
-        print("✓ ContextNotInitializedError created correctly")
+        ok("✓ ContextNotInitializedError created correctly")
 
     async def test_operations_on_closed_context(self):
         """Test all operations fail on closed context."""
-        operations_tested = []
-
-        class MockContext:
-            def __init__(self):
-                self._closed = False
-
-            def _check_closed(self):
-                if self._closed:
-                    raise ContextNotInitializedError()
-
-            async def close(self):
-                self._closed = True
-
-            async def get_profile(self):
-                self._check_closed()
-                operations_tested.append("get_profile")
-                return {}
-
-            async def get_files(self):
-                self._check_closed()
-                operations_tested.append("get_files")
-                return []
-
-            async def report_progress(self, status, percent):
-                self._check_closed()
-                operations_tested.append("report_progress")
-
-        ctx = MockContext()
+        ctx = _LifecycleMock()
 
         # Operations work before close
         await ctx.get_profile()
         await ctx.get_files()
         await ctx.report_progress("starting", 0)
 
-        assert len(operations_tested) == 3
+        assert len(ctx.operations) == 3
 
         # Close context
         await ctx.close()
 
         # All operations should fail now
-        for op_name, op_func in [
+        for op_name, op_func in (
             ("get_profile", ctx.get_profile),
             ("get_files", ctx.get_files),
             ("report_progress", lambda: ctx.report_progress("test", 50)),
-        ]:
+        ):
             try:
-                await op_func() if asyncio.iscoroutinefunction(op_func) else await op_func()
+                await op_func()
                 assert False, f"{op_name} should have raised"
             except ContextNotInitializedError:
                 pass
 
-        print("✓ All operations fail on closed context")
+        ok("✓ All operations fail on closed context")
 
 
 async def run_all_tests():
@@ -569,4 +480,13 @@ async def run_all_tests():
 
 
 if __name__ == "__main__":
-    asyncio.run(run_all_tests())
+    try:
+        import uvloop
+
+        loop_factory = uvloop.new_event_loop
+    except ImportError:  # uvloop is optional; fall back to the default loop
+        loop_factory = None
+
+    # One loop for the whole run, closed together with its default executor
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(run_all_tests())
@@ -4,6 +4,11 @@
 from datetime import datetime
 from pixell.sdk import UserContext, TaskMetadata, ContextNotInitializedError
 
+from _constants import EXPECTED_USERCONTEXT_METHODS, ok
+
+# No test reads the timestamp, so one taken at import serves them all
+_NOW = datetime.utcnow()
+
 
 def test_task_metadata_creation():
     """Test TaskMetadata dataclass creation."""
@@ -13,7 +18,7 @@ def test_task_metadata_creation():
         user_id="user-456",
         tenant_id="tenant-789",
         trace_id="trace-abc",
-        created_at=datetime.utcnow(),
+        created_at=_NOW,
         payload={"prompt": "test"},
     )
     assert metadata.task_id == "task-123"
@@ -22,7 +27,7 @@ def test_task_metadata_creation():
     assert metadata.tenant_id == "tenant-789"
     assert metadata.trace_id == "trace-abc"
     assert metadata.payload == {"prompt": "test"}
-    print("✓ TaskMetadata created successfully")
+    ok("✓ TaskMetadata created successfully")
 
 
 def test_task_metadata_all_required_fields():
@@ -33,36 +38,27 @@ def test_task_metadata_all_required_fields():
         user_id="user-456",
         tenant_id="tenant-789",
         trace_id="trace-xyz",
-        created_at=datetime.utcnow(),
+        created_at=_NOW,
     )
     assert metadata.task_id == "task-123"
     assert metadata.trace_id == "trace-xyz"
     assert metadata.created_at is not None
-    print("✓ TaskMetadata all required fields work correctly")
+    ok("✓ TaskMetadata all required fields work correctly")
 
 
 def test_context_factory_exists():
     """Test UserContext.from_task factory method exists."""
     assert hasattr(UserContext, "from_task")
     assert callable(UserContext.from_task)
-    print("✓ UserContext.from_task factory method exists")
+    ok("✓ UserContext.from_task factory method exists")
 
 
 def test_context_methods_signature():
     """Verify UserContext has expected methods (by checking class)."""
-    expected_methods = [
-        "from_task",
-        "get_user_profile",
-        "get_files",
-        "call_oauth_api",
-        "report_progress",
-        "report_error",
-    ]
-
-    for method_name in expected_methods:
-        assert hasattr(UserContext, method_name), f"Missing method: {method_name}"
+    missing = EXPECTED_USERCONTEXT_METHODS.difference(dir(UserContext))
+    assert not missing, f"Missing methods: {sorted(missing)}"
 
-    print("✓ UserContext has all expected methods")
+    ok("✓ UserContext has all expected methods")
 
 
 def test_context_not_initialized_error():
@@ -73,7 +69,7 @@ def test_context_not_initialized_error():
 
     error_with_message = ContextNotInitializedError("Custom message")
     assert str(error_with_message) == "Custom message"
-    print("✓ ContextNotInitializedError works correctly")
+    ok("✓ ContextNotInitializedError works correctly")
 
 
 if __name__ == "__main__":
@@ -4,6 +4,22 @@
 import asyncio
 from pixell.sdk import PXUIDataClient
 
+from _constants import ok
+
+_CLIENT_METHODS = frozenset(
+    {
+        # Core methods
+        "oauth_proxy_call",
+        "get_user_profile",
+        "list_files",
+        "get_file_content",
+        "list_conversations",
+        "list_task_history",
+        # Lifecycle methods
+        "close",
+    }
+)
+
 
 def test_client_creation():
     """Test client can be created with all parameters."""
@@ -17,7 +33,7 @@ def test_client_creation():
     assert client.jwt_token == "test-token"
     assert client.timeout == 30.0
     assert client.max_retries == 3
-    print("✓ PXUIDataClient created successfully with all parameters")
+    ok("✓ PXUIDataClient created successfully with all parameters")
 
 
 def test_client_defaults():
@@ -31,7 +47,7 @@ def test_client_defaults():
     # Verify defaults exist
     assert hasattr(client, "timeout")
     assert hasattr(client, "max_retries")
-    print("✓ PXUIDataClient created with default parameters")
+    ok("✓ PXUIDataClient created with default parameters")
 
 
 def test_client_methods_exist():
@@ -41,30 +57,10 @@ def test_client_methods_exist():
         jwt_token="test-token",
     )
 
-    # Core methods
-    assert hasattr(client, "oauth_proxy_call")
-    assert callable(client.oauth_proxy_call)
-
-    assert hasattr(client, "get_user_profile")
-    assert callable(client.get_user_profile)
-
-    assert hasattr(client, "list_files")
-    assert callable(client.list_files)
-
-    assert hasattr(client, "get_file_content")
-    assert callable(client.get_file_content)
-
-    assert hasattr(client, "list_conversations")
-    assert callable(client.list_conversations)
+    missing = _CLIENT_METHODS.difference(dir(client))
+    assert not missing, f"Missing methods: {sorted(missing)}"
 
-    assert hasattr(client, "list_task_history")
-    assert callable(client.list_task_history)
-
-    # Lifecycle methods
-    assert hasattr(client, "close")
-    assert callable(client.close)
-
-    print("✓ PXUIDataClient has all expected methods")
+    ok("✓ PXUIDataClient has all expected methods")
 
 
 async def test_client_context_manager():
@@ -74,12 +70,21 @@ async def test_client_context_manager():
         jwt_token="test-token",
     ) as client:
         assert client is not None
-    print("✓ PXUIDataClient context manager works")
+    ok("✓ PXUIDataClient context manager works")
 
 
 if __name__ == "__main__":
     test_client_creation()
     test_client_defaults()
     test_client_methods_exist()
-    asyncio.run(test_client_context_manager())
+    try:
+        import uvloop
+
+        loop_factory = uvloop.new_event_loop
+    except ImportError:  # uvloop is optional; fall back to the default loop
+        loop_factory = None
+
+    # Async tests share one loop, closed together with its default executor
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(test_client_context_manager())
     print("\n✓ All PXUIDataClient tests passed!")
@@ -6,53 +6,46 @@ including retry logic, error classification, and recovery strategies.
 """
 
 import asyncio
+import random
 from datetime import datetime
 from typing import List, Dict, Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
 
 from pixell.sdk import (
     ProgressReporter,
     SDKError,
-    ConsumerError,
     TaskTimeoutError,
     TaskHandlerError,
     QueueError,
-    ClientError,
     AuthenticationError,
     RateLimitError,
     APIError,
     ConnectionError,
-    ContextError,
-    ContextNotInitializedError,
     ProgressError,
 )
 
+from _constants import ERROR_HIERARCHY
 
-class TestErrorClassification:
-    """Test error type classification and hierarchy."""
+# Retry delays double per attempt up to a cap, plus a little random jitter so
+# consumers retrying at the same moment spread out instead of colliding again
+MAX_BACKOFF = 1.0
+JITTER = 0.005
 
-    def test_error_inheritance_hierarchy(self):
-        """Test the complete error inheritance hierarchy."""
-        # Consumer errors
-        assert issubclass(ConsumerError, SDKError)
-        assert issubclass(TaskTimeoutError, ConsumerError)
-        assert issubclass(TaskHandlerError, ConsumerError)
-        assert issubclass(QueueError, ConsumerError)
 
-        # Client errors
-        assert issubclass(ClientError, SDKError)
-        assert issubclass(AuthenticationError, ClientError)
-        assert issubclass(RateLimitError, ClientError)
-        assert issubclass(APIError, ClientError)
-        assert issubclass(ConnectionError, ClientError)
+def _backoff_delay(base_delay: float, attempt: int) -> float:
+    """Capped exponential backoff with jitter for the given retry attempt."""
+    return min(MAX_BACKOFF, base_delay * (1 << attempt)) + random.uniform(0, JITTER)
 
-        # Context errors
-        assert issubclass(ContextError, SDKError)
-        assert issubclass(ContextNotInitializedError, ContextError)
 
-        # Progress errors
-        assert issubclass(ProgressError, SDKError)
+class TestErrorClassification:
+    """Test error type classification and hierarchy."""
 
-        print("✓ Error inheritance hierarchy is correct")
+    @pytest.mark.parametrize("child,parent", ERROR_HIERARCHY)
+    def test_error_inheritance_hierarchy(self, child, parent):
+        """Test one link of the error inheritance hierarchy."""
+        assert issubclass(child, parent)
 
     def test_error_details_preservation(self):
         """Test that error details are preserved correctly."""
@@ -122,13 +115,20 @@ class TestRetryLogic:
                 except ConnectionError:
                     if attempt == max_retries:
                         raise
-                    await asyncio.sleep(0.01 * (2**attempt))  # Exponential backoff
-            raise ConnectionError("Max retries exceeded")
+                    await asyncio.sleep(_backoff_delay(0.01, attempt))
 
-        result = await retry_wrapper()
+        # Record the backoff delays instead of actually sleeping through them
+        with patch("asyncio.sleep", new=AsyncMock()) as sleep:
+            result = await retry_wrapper()
         assert result == "success"
         assert attempt_count == max_retries
 
+        # Two failures, each followed by one backoff
+        delays = [call.args[0] for call in sleep.await_args_list]
+        assert len(delays) == max_retries - 1
+        for attempt, delay in enumerate(delays):
+            assert 0.01 * 2**attempt <= delay <= 0.01 * 2**attempt + JITTER
+
         print("✓ Connection errors trigger retries correctly")
 
     async def test_no_retry_on_authentication_error(self):
@@ -178,7 +178,6 @@ class TestRetryLogic:
 
     async def test_exponential_backoff(self):
         """Test exponential backoff timing."""
-        delays: List[float] = []
         base_delay = 0.01
 
         async def operation_with_backoff(max_attempts: int):
@@ -188,20 +187,24 @@ class TestRetryLogic:
                 except ConnectionError:
                     if attempt == max_attempts - 1:
                         raise
-                    delay = base_delay * (2**attempt)
-                    delays.append(delay)
-                    await asyncio.sleep(delay)
+                    await asyncio.sleep(_backoff_delay(base_delay, attempt))
 
-        try:
-            await operation_with_backoff(4)
-        except ConnectionError:
-            pass
+        # Record the requested delays instead of actually sleeping through them
+        with patch("asyncio.sleep", new=AsyncMock()) as sleep:
+            try:
+                await operation_with_backoff(4)
+            except ConnectionError:
+                pass
+        delays = [call.args[0] for call in sleep.await_args_list]
 
-        # Verify exponential growth
+        # Verify exponential growth, allowing for jitter
         assert len(delays) == 3  # 4 attempts, 3 retries
-        assert delays[0] == base_delay * 1  # 2^0
-        assert delays[1] == base_delay * 2  # 2^1
-        assert delays[2] == base_delay * 4  # 2^2
+        for attempt, delay in enumerate(delays):
+            expected = base_delay * 2**attempt
+            assert expected <= delay <= expected + JITTER
+
+        # Verify the cap holds however many attempts have failed
+        assert _backoff_delay(base_delay, 20) <= MAX_BACKOFF + JITTER
 
         print("✓ Exponential backoff timing is correct")
 
@@ -360,23 +363,16 @@ class TestErrorRecovery:
 class TestProgressErrorHandling:
     """Test progress reporting error scenarios."""
 
-    async def test_progress_invalid_percent_validation(self):
+    def test_progress_invalid_percent_validation(self):
         """Test that invalid percent values are rejected."""
-        reporter = ProgressReporter(
-            redis_url="redis://localhost:6379",
-            task_id="task-123",
-            user_id="user-456",
-        )
-
-        # Test invalid percent values
+        # The range check is pure argument validation, so exercise it directly
+        # instead of building a reporter and going through update()
         invalid_percents = [-10, -1, 101, 150, 200]
 
         for percent in invalid_percents:
-            try:
-                await reporter.update("processing", percent=percent)
-                assert False, f"Should have raised for percent={percent}"
-            except ProgressError as e:
-                assert "INVALID_PERCENT" in e.code
+            with pytest.raises(ProgressError) as exc_info:
+                ProgressReporter._validate_percent(percent)
+            assert exc_info.value.code == "INVALID_PERCENT"
 
         print("✓ Invalid percent values are rejected")
 
@@ -487,7 +483,9 @@ async def run_all_tests():
     """Run all error recovery tests."""
     # Error classification tests
     classification = TestErrorClassification()
-    classification.test_error_inheritance_hierarchy()
+    for child, parent in ERROR_HIERARCHY:
+        classification.test_error_inheritance_hierarchy(child, parent)
+    print("✓ Error inheritance hierarchy is correct")
     classification.test_error_details_preservation()
     classification.test_error_serialization()
 
@@ -507,7 +505,7 @@ async def run_all_tests():
 
     # Progress error tests
     progress = TestProgressErrorHandling()
-    await progress.test_progress_invalid_percent_validation()
+    progress.test_progress_invalid_percent_validation()
     await progress.test_progress_continues_after_error()
 
     # Timeout tests
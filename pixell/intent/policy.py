@@ -1,9 +1,11 @@
-from typing import Set
+import sys
+from typing import FrozenSet, Iterable
 
 
 class IntentPolicy:
-    def __init__(self, allowed: Set[str] | None = None):
-        self.allowed: Set[str] = set(allowed or [])
+    def __init__(self, allowed: Iterable[str] | None = None):
+        # Interned and frozen once, so lookups are hash-then-identity in the common case
+        self.allowed: FrozenSet[str] = frozenset(sys.intern(intent) for intent in allowed or ())
 
     def is_allowed(self, intent: str) -> bool:
         return not self.allowed or intent in self.allowed
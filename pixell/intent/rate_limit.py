@@ -1,21 +1,28 @@
 import time
-from collections import defaultdict, deque
-from typing import Deque, Dict, Tuple
+from typing import Dict, List, Tuple
 
 
 class RateLimiter:
+    """Token bucket per (session, intent): bursts of ``max_calls``, refilled evenly
+    at ``max_calls / per_seconds`` tokens per second."""
+
     def __init__(self, max_calls: int, per_seconds: float):
         self.max_calls = max_calls
         self.per_seconds = per_seconds
-        self.calls: Dict[Tuple[str, str], Deque[float]] = defaultdict(deque)
+        self.rate = max_calls / per_seconds
+        # key -> [tokens, last_refill]; a missing key is a full bucket
+        self.buckets: Dict[Tuple[str, str], List[float]] = {}
 
     def allow(self, session_id: str, intent: str) -> bool:
         key = (session_id, intent)
-        now = time.time()
-        q = self.calls[key]
-        while q and now - q[0] > self.per_seconds:
-            q.popleft()
-        if len(q) < self.max_calls:
-            q.append(now)
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [float(self.max_calls), now]
+        tokens = min(self.max_calls, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
             return True
+        bucket[0] = tokens
         return False
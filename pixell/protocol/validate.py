@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 from jsonschema import Draft7Validator
 
-
 _SCHEMAS: Dict[str, Dict[str, Any]] | None = None
+_VALIDATORS: Dict[str, Callable[[Dict[str, Any]], None]] | None = None
 
 
 def _load_schemas() -> Dict[str, Dict[str, Any]]:
@@ -28,18 +29,27 @@ def _load_schemas() -> Dict[str, Dict[str, Any]]:
     return _SCHEMAS
 
 
+def _load_validators() -> Dict[str, Callable[[Dict[str, Any]], None]]:
+    """Build one validator per message type, once, and keep its bound ``validate``."""
+    global _VALIDATORS
+    if _VALIDATORS is not None:
+        return _VALIDATORS
+    _VALIDATORS = {
+        msg_type: Draft7Validator(schema).validate for msg_type, schema in _load_schemas().items()
+    }
+    return _VALIDATORS
+
+
 def validate_envelope(envelope: Dict[str, Any]) -> None:
     """Validate a protocol envelope against its JSON Schema. Raises jsonschema.ValidationError on failure."""
-    schemas = _load_schemas()
     msg_type = envelope.get("type")
-    if msg_type not in schemas:
+    validators = _load_validators()
+    if not isinstance(msg_type, str) or msg_type not in validators:
         raise ValueError(f"Unknown protocol message type: {msg_type}")
-    Draft7Validator(schemas[msg_type]).validate(envelope)
+    validators[msg_type](envelope)
 
 
 def validate_outbound_if_dev(envelope: Dict[str, Any]) -> None:
     """Validate outbound envelopes in development mode (no-op in production)."""
-    import os
-
     if os.getenv("PIXELL_ENV", "development").lower() in ("development", "dev", "local"):
         validate_envelope(envelope)
@@ -80,6 +80,19 @@ class ProgressReporter:
                 cause=e,
             )
 
+    @staticmethod
+    def _validate_percent(percent: float) -> None:
+        """Check that a completion percentage is within 0-100.
+
+        Raises:
+            ProgressError: If percent is out of range (code INVALID_PERCENT)
+        """
+        if not 0 <= percent <= 100:
+            raise ProgressError(
+                f"Percent must be between 0 and 100, got {percent}",
+                code="INVALID_PERCENT",
+            )
+
     async def update(
         self,
         status: str,
@@ -102,11 +115,7 @@ class ProgressReporter:
         }
 
         if percent is not None:
-            if not 0 <= percent <= 100:
-                raise ProgressError(
-                    f"Percent must be between 0 and 100, got {percent}",
-                    code="INVALID_PERCENT",
-                )
+            self._validate_percent(percent)
             data["percent"] = percent
 
         if message:
@@ -14,3 +14,24 @@ def test_rate_limiter_window():
     assert limiter.allow(session, "do")
     assert limiter.allow(session, "do")
     assert not limiter.allow(session, "do")
+
+
+def test_rate_limiter_refills(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("pixell.intent.rate_limit.time.monotonic", lambda: now[0])
+    limiter = RateLimiter(max_calls=2, per_seconds=60)
+    assert limiter.allow("s1", "do")
+    assert limiter.allow("s1", "do")
+    assert not limiter.allow("s1", "do")
+    # One token comes back every 30 seconds
+    now[0] += 30
+    assert limiter.allow("s1", "do")
+    assert not limiter.allow("s1", "do")
+    # Other keys have their own bucket
+    assert limiter.allow("s2", "do")
+
+
+def test_policy_allows_everything_when_empty():
+    policy = IntentPolicy()
+    assert policy.is_allowed("anything")
+    assert policy.allowed == frozenset()
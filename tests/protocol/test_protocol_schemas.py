@@ -64,3 +64,19 @@ def test_ui_patch_invalid_missing_op():
     }
     with pytest.raises(Exception):
         validate_envelope(envelope)
+
+
+def test_validators_are_built_once(monkeypatch):
+    from pixell.protocol import validate as validate_module
+
+    monkeypatch.setattr(validate_module, "_VALIDATORS", None)
+    envelope = {"type": "ui.patch", "patch": []}
+    validate_envelope(envelope)
+    validators = validate_module._VALIDATORS
+    validate_envelope(envelope)
+    assert validate_module._VALIDATORS is validators
+
+
+def test_unknown_type_rejected():
+    with pytest.raises(ValueError):
+        validate_envelope({"type": "ui.unknown"})
@@ -96,6 +96,16 @@ class TestProgressReporter:
 
         assert "INVALID_PERCENT" in str(exc_info.value.code)
 
+    def test_validate_percent_bounds(self):
+        """Test the percent range check accepts 0-100 inclusive and nothing else."""
+        ProgressReporter._validate_percent(0)
+        ProgressReporter._validate_percent(100)
+
+        with pytest.raises(ProgressError) as exc_info:
+            ProgressReporter._validate_percent(100.5)
+
+        assert exc_info.value.code == "INVALID_PERCENT"
+
     @pytest.mark.asyncio
     async def test_error(self, reporter):
         """Test error reporting."""